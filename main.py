@@ -1,10 +1,11 @@
 import sys
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent / "src"))
-
-from cli import cli
-
 if __name__ == "__main__":
+    # Add src to path for imports
+    src_root = str(Path(__file__).parent / "src")
+    if src_root not in sys.path:
+        sys.path.insert(0, src_root)
+    
+    from cli import cli
     cli()
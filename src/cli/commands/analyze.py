@@ -0,0 +1,130 @@
+import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..terminal import setup_logging, print_success, print_error, _spinner_progress, _run_with_spinner
+
+def _analyze_streaming(root: str, output: str, batch_size: Optional[int], stream_batch: int, progress, task) -> list:
+    """
+    Analyze videos in batches of `stream_batch` while a background thread keeps walking `root`.
+    
+    Returns:
+        List of (video_path, highlights) tuples across all batches
+    """
+    from utils.video_analysis import analyze_videos_sync
+    from utils.video_files import iter_video_files
+    
+    paths: queue.Queue = queue.Queue(maxsize=stream_batch * 2)
+    walk_done = object()
+    stop = threading.Event()
+    
+    def walk():
+        try:
+            for video_path in iter_video_files(root):
+                if stop.is_set():
+                    break
+                paths.put(video_path)
+        finally:
+            paths.put(walk_done)
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        walker = executor.submit(walk)
+        try:
+            finished = False
+            while not finished:
+                batch = []
+                while len(batch) < stream_batch:
+                    video_path = paths.get()
+                    if video_path is walk_done:
+                        finished = True
+                        break
+                    batch.append(video_path)
+                
+                if batch:
+                    # Later batches append to the token cost file instead of replacing it
+                    results.extend(analyze_videos_sync(batch, output, batch_size, append_token_costs=bool(results)))
+                    progress.update(task, description=f"Analyzed {len(results)}/? videos...")
+        finally:
+            # Unblock the walker if it is still waiting on a full queue
+            stop.set()
+            while not walker.done():
+                try:
+                    paths.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        
+        # Re-raise any error from the directory walk
+        walker.result()
+    
+    return results
+
+@click.command()
+@click.argument('path', type=click.Path(exists=True))
+@click.option('--output', '-o', type=str, default='exported_metadata/highlights.json', help='Output file for highlights')
+@click.option('--batch-size', '-b', type=int, help='Number of videos to process concurrently')
+@click.option('--stream-batch', type=click.IntRange(min=1), help='Start analyzing every N videos found instead of scanning the whole directory first')
+def analyze(path: str, output: str, batch_size: Optional[int], stream_batch: Optional[int]):
+    """Analyze video files for highlights using AI."""
+    setup_logging()
+    try:
+        from utils.video_analysis import analyze_videos_sync
+        from utils.video_files import iter_video_files
+        
+        file_path = Path(path)
+        single_file = file_path.is_file()
+        
+        if single_file:
+            # Single file, no directory scan needed
+            video_files = [str(file_path)]
+            description = f"Analyzing {file_path.name}..."
+        elif stream_batch:
+            # Directory, analyzed while it is still being scanned
+            with _spinner_progress() as progress:
+                task = progress.add_task("Analyzed 0/? videos...", total=None)
+                results = _analyze_streaming(str(file_path), output, batch_size, stream_batch, progress, task)
+                progress.remove_task(task)
+            
+            if not results:
+                print_error(f"No video files found in {file_path}")
+                return
+            
+            total_highlights = sum(len(highlights) for _, highlights in results)
+            if total_highlights > 0:
+                print_success(f"Analysis complete: {total_highlights} highlights found across {len(results)} videos")
+            else:
+                print_error("No highlights found in any videos")
+            return
+        else:
+            # Directory
+            video_files = list(iter_video_files(str(file_path)))
+            
+            if not video_files:
+                print_error(f"No video files found in {file_path}")
+                return
+            
+            description = f"Analyzing {len(video_files)} videos..."
+        
+        results = _run_with_spinner(description, analyze_videos_sync, video_files, output, batch_size)
+        
+        total_highlights = sum(len(highlights) for _, highlights in results)
+        if single_file:
+            if total_highlights > 0:
+                print_success(f"Analysis complete: {total_highlights} highlights found")
+            else:
+                print_error("No highlights found or analysis failed")
+        elif total_highlights > 0:
+            print_success(f"Analysis complete: {total_highlights} highlights found across {len(video_files)} videos")
+        else:
+            print_error("No highlights found in any videos")
+            
+    except Exception as e:
+        print_error(f"Analysis failed: {str(e)}")
+        sys.exit(1)
+
+cmd = analyze
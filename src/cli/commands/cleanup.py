@@ -0,0 +1,28 @@
+import sys
+
+import click
+
+from ..terminal import setup_logging, print_success, print_error, _run_with_spinner
+
+@click.command()
+def cleanup():
+    """Clean up uploaded files from Gemini Files API."""
+    setup_logging()
+    try:
+        from kill_processor import KillProcessor
+        
+        processor = KillProcessor()
+        
+        success = _run_with_spinner("Cleaning up uploaded files...", processor.cleanup_uploaded_files)
+        
+        if success:
+            print_success("File cleanup completed successfully")
+        else:
+            print_error("Failed to complete file cleanup")
+            sys.exit(1)
+            
+    except Exception as e:
+        print_error(f"Cleanup failed: {str(e)}")
+        sys.exit(1)
+
+cmd = cleanup
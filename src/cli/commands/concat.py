@@ -0,0 +1,80 @@
+import sys
+import os
+import atexit
+import asyncio
+from typing import Optional
+
+import click
+
+from ..terminal import setup_logging, print_success, print_error, print_info, _run_with_spinner
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop shared by every concatenation in this process."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+atexit.register(lambda: _loop.close() if _loop and not _loop.is_closed() else None)
+
+@click.command()
+def concat():
+    """Concatenate multiple videos with drag-and-drop reordering interface."""
+    setup_logging()
+    try:
+        from utils.concat_gui import show_concatenation_dialog
+        from utils.video_concatenator import VideoConcatenator
+        from utils.config import get_config
+        
+        print_info("Opening video selection dialog...")
+        
+        # Show the concatenation dialog
+        selected_files = show_concatenation_dialog()
+        
+        if not selected_files:
+            print_info("No videos selected for concatenation")
+            return
+        
+        if len(selected_files) < 2:
+            print_error("Need at least 2 videos to concatenate")
+            return
+        
+        print_info(f"Selected {len(selected_files)} videos for concatenation")
+        
+        # Load config to determine if shorts should be created
+        config = get_config()
+        create_shorts = config.make_short
+        
+        # Create concatenator and process videos
+        concatenator = VideoConcatenator()
+        
+        # Run the concatenation asynchronously
+        results = _run_with_spinner(
+            "Concatenating videos...",
+            _get_loop().run_until_complete,
+            concatenator.concatenate_and_process(selected_files, create_shorts=create_shorts)
+        )
+        
+        if results:
+            print_success(f"Successfully created {len(results)} video(s)!")
+            
+            # Show results
+            for i, result_path in enumerate(results):
+                file_name = os.path.basename(result_path)
+                if i == 0:
+                    print_success(f"Regular compilation: {file_name}")
+                else:
+                    print_success(f"Shorts version: {file_name}")
+            
+            print_info(f"Videos saved to: exported_videos/")
+        else:
+            print_error("Failed to concatenate videos")
+            sys.exit(1)
+            
+    except Exception as e:
+        print_error(f"Concatenation failed: {str(e)}")
+        sys.exit(1)
+
+cmd = concat
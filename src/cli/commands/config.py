@@ -0,0 +1,26 @@
+import sys
+
+import click
+
+from ..terminal import setup_logging, print_success, print_error, _run_with_spinner
+
+@click.command()
+@click.option('--output', '-o', type=str, default='config.json', help='Output path for config file')
+def config(output: str):
+    """Create a configuration template file."""
+    setup_logging()
+    
+    try:
+        from kill_processor import KillProcessor
+        
+        processor = KillProcessor()
+        
+        _run_with_spinner("Creating config template...", processor.create_config_template, output)
+        
+        print_success(f"Config template created: {output}")
+        
+    except Exception as e:
+        print_error(f"Config creation failed: {str(e)}")
+        sys.exit(1)
+
+cmd = config
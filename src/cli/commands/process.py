@@ -0,0 +1,98 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..terminal import setup_logging, print_success, print_error, show_results_table, _spinner_progress, _run_with_spinner
+
+def _process_parallel(processor, directory: str, workers: int, progress, task) -> list:
+    """Process every video under a directory on a pool of worker threads."""
+    from kill_processor import DIRECTORY_VIDEO_EXTENSIONS
+    from utils.video_files import iter_video_files
+    
+    video_files = list(iter_video_files(directory, DIRECTORY_VIDEO_EXTENSIONS))
+    if not video_files:
+        return []
+    
+    results = []
+    done = 0
+    progress.update(task, description=f"Processed 0/{len(video_files)} videos...")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Uploads are cleaned up once at the end; cleaning up per video
+            # would delete files other workers are still analyzing
+            futures = [
+                executor.submit(processor.process_single_video_sync, video, cleanup=False)
+                for video in video_files
+            ]
+            for future in as_completed(futures):
+                done += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print_error(f"Processing error: {str(e)}")
+                    result = None
+                if result:
+                    results.append(result)
+                progress.update(task, description=f"Processed {done}/{len(video_files)} videos...")
+    finally:
+        # The pool has drained; clean up even if every worker failed, since
+        # failed analyses can still leave uploads behind
+        processor.cleanup_uploaded_files()
+    
+    return results
+
+@click.command()
+@click.argument('path', type=click.Path(exists=True))
+@click.option('--workers', '-w', type=click.IntRange(min=1), help='Process directory videos on N worker threads')
+def process(path: str, workers: Optional[int]):
+    """Process video files or directory to extract kill highlights."""
+    setup_logging()
+    processor = None
+    try:
+        from kill_processor import KillProcessor
+        
+        processor = KillProcessor()
+        processor.start_warm_up()
+        file_path = Path(path)
+        
+        if file_path.is_file():
+            result = _run_with_spinner(
+                f"Processing {file_path.name}...",
+                processor.process_single_video_sync, str(file_path)
+            )
+            
+            if result:
+                print_success(f"Created compilation: {os.path.basename(result)}")
+            else:
+                print_error("No kills found or processing failed")
+        else:
+            if workers:
+                with _spinner_progress() as progress:
+                    task = progress.add_task(f"Processing directory {file_path.name}...", total=None)
+                    results = _process_parallel(processor, str(file_path), workers, progress, task)
+                    progress.remove_task(task)
+            else:
+                results = _run_with_spinner(
+                    f"Processing directory {file_path.name}...",
+                    processor.process_directory, str(file_path)
+                )
+            
+            if results:
+                print_success(f"Created {len(results)} compilation(s)")
+                show_results_table(results)
+            else:
+                print_error("No videos processed successfully")
+                
+    except Exception as e:
+        print_error(f"Processing failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        # Stop the processor's event loop and compilation pool
+        if processor is not None:
+            processor.close()
+
+cmd = process
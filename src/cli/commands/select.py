@@ -0,0 +1,33 @@
+import sys
+
+import click
+
+from ..terminal import setup_logging, print_success, print_error, print_info, show_results_table
+
+@click.command()
+def select():
+    """Manually select videos via file dialog and process them."""
+    setup_logging()
+    
+    try:
+        from kill_processor import KillProcessor
+        
+        processor = KillProcessor()
+        processor.start_warm_up()
+        
+        print_info("Starting video selection process...")
+        print_info("You can process multiple batches of videos - you'll be asked after each batch if you want to continue.")
+        
+        results = processor.process_selected_videos()
+        
+        if results:
+            print_success(f"All processing complete! Successfully processed {len(results)} video(s) total")
+            show_results_table(results)
+        else:
+            print_info("No videos were processed")
+            
+    except Exception as e:
+        print_error(f"Manual selection failed: {str(e)}")
+        sys.exit(1)
+
+cmd = select
@@ -0,0 +1,34 @@
+import sys
+from typing import Optional
+
+import click
+
+from ..terminal import setup_logging, print_error, print_info, _get_console
+
+@click.command()
+@click.option('--directory', '-d', type=str, help='Directory to watch (defaults to config setting)')
+@click.option('--ignore-existing', is_flag=True, default=True, help='Ignore existing files and only process new ones')
+def watch(directory: Optional[str], ignore_existing: bool):
+    """Watch directory for new videos and process them automatically."""
+    setup_logging()
+    
+    try:
+        # Import here to avoid circular imports
+        from kill_processor import KillProcessor
+        
+        processor = KillProcessor()
+        processor.start_warm_up()
+        
+        with _get_console().status("[bold green]Starting directory watch...", spinner="dots"):
+            print_info(f"Watching directory: {directory or 'default from config'}")
+            print_info(f"Ignore existing files: {ignore_existing}")
+        
+        processor.start_watching(directory, ignore_existing)
+        
+    except KeyboardInterrupt:
+        print_info("Watch stopped by user")
+    except Exception as e:
+        print_error(f"Watch failed: {str(e)}")
+        sys.exit(1)
+
+cmd = watch
@@ -1,31 +1,255 @@
 import os
+import time
+import random
 import asyncio
 import logging
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-from utils.config import Config
-from utils.video_analysis import analyze_video
-from utils.video_processor import VideoProcessor
+from utils.config import get_config, get_api_key
+from utils.video_analysis import analyze_video, forget_uploaded_files, MissingAPIKeyError, UnsupportedVideoFormatError
+from utils.video_processor import VideoProcessor, MAX_OUTPUTS_PER_FFMPEG
 from utils.file_watcher import FileWatcher
 from utils.logging_config import setup_logging
 from utils.delete_files import FileDeleter
-from utils.file_selector import FileSelector
 from utils.process_monitor import GameProcessMonitor
 from utils.video_queue import VideoQueue
-from utils.token_counter import export_token_data_to_csv, append_token_data_to_csv, log_token_summary
+from utils.video_files import iter_video_files
+from utils import json_io
+from utils.token_counter import export_token_data_to_csv, append_token_rows_to_csv, log_token_summary, total_token_cost
 
 logger = logging.getLogger(__name__)
 
+# Extensions picked up when processing a whole directory
+DIRECTORY_VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv')
+
+# ijson is optional; without it large analysis files are always parsed whole
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Analysis files at least this large are streamed for one-off lookups
+STREAM_SCAN_MIN_BYTES = 64 * 1024 * 1024
+
+# Watch mode token records are written to CSV at least this often, or
+# sooner once this many are buffered
+TOKEN_CSV_FLUSH_SECONDS = 8.0
+TOKEN_CSV_FLUSH_ROWS = 16
+
+# Written by create_config_template; kept pre-formatted since it never changes
+_CONFIG_TEMPLATE_JSON = """\
+{
+  "batch_size": 5,
+  "model_name": "gemini-2.5-flash-preview-04-17",
+  "max_retries": 10,
+  "retry_delay_seconds": 2,
+  "max_retry_delay_seconds": 30,
+  "min_highlight_duration_seconds": 5,
+  "username": "your_username_here",
+  "temperature": 1.0,
+  "use_caching": true,
+  "cache_ttl_seconds": 3600,
+  "game_type": "kills",
+  "max_zero_highlight_retries": 3,
+  "make_short": false,
+  "shorts": {
+    "no_webcam": false,
+    "add_subtitles": false
+  },
+  "folder_watcher": {
+    "watch_directory": "./videos",
+    "polling_interval_seconds": 2,
+    "process_immediately": true,
+    "reprocess_analyzed_videos": false
+  }
+}"""
+
+# Analysis results for every processed video
+KILLS_FILE = "exported_metadata/kills.json"
+
+# Videos processed by earlier runs, one normalized path per line, so
+# restarts don't re-check every file
+PROCESSED_VIDEOS_FILE = "exported_metadata/processed_videos.txt"
+
+def _video_key(video_path: str) -> str:
+    """
+    Normalize a video path so different spellings of the same file match.
+    
+    Resolves symlinks and relative segments and, on Windows, folds case
+    and separators.
+    """
+    return os.path.normcase(os.path.realpath(video_path))
+
+# Parsed analysis files shared by every processor, keyed by path.
+# Each entry is (mtime_ns, size, data, highlights indexed by source filename).
+_kills_cache: Dict[str, tuple] = {}
+_kills_cache_lock = threading.Lock()
+
+def _basename(path: str) -> str:
+    """Filename of a path written on any platform, splitting on both separators."""
+    return path.rpartition('\\')[2].rpartition('/')[2]
+
+def _source_basename(highlight: Dict[str, Any]) -> str:
+    """
+    Filename of a highlight's source video.
+    
+    Uses the source_basename stored at analysis time, falling back to
+    splitting source_video for older records.
+    """
+    name = highlight.get("source_basename")
+    if name is None:
+        name = _basename(highlight.get("source_video", ""))
+    return name
+
+def _index_highlights(data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group an analysis file's highlights by source video filename."""
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    for highlight in data.get("highlights", []):
+        index.setdefault(_source_basename(highlight), []).append(highlight)
+    return index
+
+def _load_kills_entry(output_file: str) -> Optional[tuple]:
+    """
+    Return the cached entry for an analysis file, re-reading it only when
+    its mtime or size changes.
+    
+    Args:
+        output_file: Path to the JSON file containing previous analyses
+        
+    Returns:
+        (mtime_ns, size, data, index) tuple, or None if the file does not exist
+    """
+    try:
+        st = os.stat(output_file)
+    except FileNotFoundError:
+        with _kills_cache_lock:
+            _kills_cache.pop(output_file, None)
+        return None
+    
+    with _kills_cache_lock:
+        cached = _kills_cache.get(output_file)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached
+    
+    data = json_io.load_file(output_file)
+    entry = (st.st_mtime_ns, st.st_size, data, _index_highlights(data))
+    with _kills_cache_lock:
+        _kills_cache[output_file] = entry
+    return entry
+
+def _store_kills_entry(output_file: str, data: Dict[str, Any]):
+    """
+    Cache data as the current contents of a freshly written analysis file.
+    
+    When the write only appended highlights to the cached data, as each
+    analysis does, the previous index is extended with the new highlights
+    instead of being rebuilt from every highlight in the file.
+    """
+    st = os.stat(output_file)
+    highlights = data.get("highlights", [])
+    with _kills_cache_lock:
+        previous = _kills_cache.get(output_file)
+    
+    index = None
+    if previous is not None:
+        old_highlights = previous[2].get("highlights", [])
+        old_count = len(old_highlights)
+        if len(highlights) >= old_count and (
+            old_count == 0
+            or (highlights[0] is old_highlights[0] and highlights[old_count - 1] is old_highlights[-1])
+        ):
+            # Copy the outer dict and touched lists so readers of the old
+            # index never see it change
+            index = dict(previous[3])
+            for highlight in highlights[old_count:]:
+                name = _source_basename(highlight)
+                index[name] = index.get(name, []) + [highlight]
+    if index is None:
+        index = _index_highlights(data)
+    
+    entry = (st.st_mtime_ns, st.st_size, data, index)
+    with _kills_cache_lock:
+        _kills_cache[output_file] = entry
+
+# Token record fields for a video that used no tokens
+_ZERO_TOKEN_USAGE = {
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "cached_tokens": 0,
+    "total_tokens": 0,
+    "cost": 0.0
+}
+
+def _zero_token_record(video_path: str, status: str, model_name: str, game_type: str, thinking_mode: bool = True) -> Dict[str, Any]:
+    """Build a token record for a failed video or one reusing an existing analysis."""
+    record = {
+        "video": video_path,
+        "status": status,
+        "model_name": model_name,
+        "game_type": game_type,
+        "thinking_mode": thinking_mode
+    }
+    record.update(_ZERO_TOKEN_USAGE)
+    record["timestamp_ns"] = time.time_ns()
+    return record
+
+def _backoff_delay(base_delay: float, attempt: int, max_delay: float = 30.0, jitter: float = 0.5) -> float:
+    """
+    Exponential backoff delay with random jitter for a retry attempt.
+    
+    Args:
+        base_delay: Delay before the first retry in seconds
+        attempt: Zero-based retry attempt number
+        max_delay: Upper bound on the delay before jitter is applied
+        jitter: Maximum extra fraction of the delay added at random
+        
+    Returns:
+        Number of seconds to wait before retrying
+    """
+    return min(max_delay, base_delay * (2 ** attempt)) * (1 + random.uniform(0, jitter))
+
+# Errors that will fail the same way on every attempt
+_NON_RETRYABLE_ERRORS = (FileNotFoundError, PermissionError, MissingAPIKeyError, UnsupportedVideoFormatError)
+_NON_RETRYABLE_STATUS_CODES = (400, 401, 403, 404)
+_NON_RETRYABLE_MARKERS = ("API_KEY_INVALID", "PERMISSION_DENIED", "UNAUTHENTICATED", "INVALID_ARGUMENT")
+
+def _is_retryable(exc: Exception) -> bool:
+    """
+    Check whether a video analysis error is worth retrying.
+    
+    Missing files, non-MP4 files, a missing API key and authentication or
+    bad-request API errors are permanent; anything else (timeouts, rate
+    limits, unavailable service, malformed responses) is retried.
+    
+    Args:
+        exc: Exception raised while analyzing a video
+        
+    Returns:
+        True if the analysis should be retried, False otherwise
+    """
+    if isinstance(exc, _NON_RETRYABLE_ERRORS):
+        return False
+    if getattr(exc, "code", None) in _NON_RETRYABLE_STATUS_CODES:
+        return False
+    # analyze_video wraps API errors in RuntimeError, so check the message too
+    message = str(exc)
+    return not any(marker in message for marker in _NON_RETRYABLE_MARKERS)
+
 class KillProcessor:
     """Main processor for analyzing videos and creating kill compilations."""
     
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
         self.video_processor = VideoProcessor(output_dir="exported_videos")
-        self.processed_videos: set = set()
+        # Normalized paths of videos already handled, persisted across runs
+        self._processed_lock = threading.Lock()
+        self.processed_videos: set = self._load_processed_videos()
         self.process_monitor: Optional[GameProcessMonitor] = None
         self.video_queue = VideoQueue(self.config)
         
@@ -33,6 +257,23 @@ class KillProcessor:
         self.watch_mode_start_time: Optional[datetime] = None
         self.watch_mode_csv_path: Optional[str] = None
         self.watch_mode_token_data: List[Dict[str, Any]] = []
+        # Records not yet written to the watch mode CSV
+        self._token_csv_buffer: List[Dict[str, Any]] = []
+        self._token_csv_lock = threading.Lock()
+        self._token_flush_stop = threading.Event()
+        self._token_flush_thread: Optional[threading.Thread] = None
+        
+        # Event loop shared by synchronous callers, run on a background thread
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        
+        # Runs ffmpeg compilations off the event loop, sized separately from
+        # the number of concurrent analyses
+        self._compile_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Files API client for cleanup, created on first use
+        self._file_deleter: Optional[FileDeleter] = None
         
         # Setup logging
         setup_logging()
@@ -41,6 +282,120 @@ class KillProcessor:
         Path("exported_metadata").mkdir(exist_ok=True)
         Path("exported_videos").mkdir(exist_ok=True)
     
+    def _load_processed_videos(self) -> set:
+        """Load the set of processed video paths saved by previous runs."""
+        try:
+            with open(PROCESSED_VIDEOS_FILE, 'r', encoding='utf-8') as f:
+                return {line.rstrip('\n') for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Error reading {PROCESSED_VIDEOS_FILE}: {e}")
+            return set()
+    
+    def _save_processed_videos(self):
+        """Rewrite the processed video file from the set. Caller must hold _processed_lock."""
+        try:
+            os.makedirs(os.path.dirname(PROCESSED_VIDEOS_FILE), exist_ok=True)
+            tmp_path = f"{PROCESSED_VIDEOS_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{key}\n" for key in sorted(self.processed_videos))
+            os.replace(tmp_path, PROCESSED_VIDEOS_FILE)
+        except OSError as e:
+            logger.warning(f"Failed to save {PROCESSED_VIDEOS_FILE}: {e}")
+    
+    def _is_processed(self, video_path: str) -> bool:
+        """Check whether a video was already processed in this or a previous run."""
+        return _video_key(video_path) in self.processed_videos
+    
+    def _mark_processed(self, video_path: str):
+        """Record a video as processed and append it to the processed video file."""
+        key = _video_key(video_path)
+        with self._processed_lock:
+            if key in self.processed_videos:
+                return
+            self.processed_videos.add(key)
+            try:
+                os.makedirs(os.path.dirname(PROCESSED_VIDEOS_FILE), exist_ok=True)
+                with open(PROCESSED_VIDEOS_FILE, 'a', encoding='utf-8', buffering=1) as f:
+                    f.write(f"{key}\n")
+            except OSError as e:
+                logger.warning(f"Failed to save {PROCESSED_VIDEOS_FILE}: {e}")
+    
+    def _unmark_processed(self, video_paths: List[str]):
+        """Forget that videos were processed so they can be analyzed again."""
+        keys = {_video_key(video_path) for video_path in video_paths}
+        with self._processed_lock:
+            if self.processed_videos.isdisjoint(keys):
+                return
+            self.processed_videos -= keys
+            self._save_processed_videos()
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the shared event loop, starting its background thread on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="KillProcessorLoop",
+                    daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+    
+    def _run_coroutine(self, coro):
+        """Run a coroutine on the shared event loop and wait for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        return future.result()
+    
+    def _get_compile_executor(self) -> ThreadPoolExecutor:
+        """Return the compilation thread pool, creating it on first use."""
+        if self._compile_executor is not None:
+            return self._compile_executor
+        # Each compilation is one encode, so stay under the NVENC session cap
+        max_workers = self.video_processor.max_concurrent_encodes((os.cpu_count() or 2) // 2)
+        with self._loop_lock:
+            if self._compile_executor is None:
+                self._compile_executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="Compile"
+                )
+            return self._compile_executor
+    
+    async def _compile_highlights(self, video_path: str, highlights: List[Dict[str, Any]]) -> Optional[str]:
+        """Create a video's compilation on the compilation pool so analyses keep running."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_compile_executor(),
+            self.video_processor.process_video_highlights,
+            video_path,
+            highlights
+        )
+    
+    def start_warm_up(self):
+        """Warm FFmpeg up on a background thread while the first videos are being analyzed."""
+        threading.Thread(target=self.video_processor.warm_up, name="FFmpegWarmup", daemon=True).start()
+    
+    def close(self):
+        """Stop the shared event loop and compilation pool and wait for their threads to exit."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            executor = self._compile_executor
+            self._loop = None
+            self._loop_thread = None
+            self._compile_executor = None
+        
+        if executor is not None:
+            executor.shutdown(wait=True)
+        
+        if loop is None:
+            return
+        
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    
     def _on_game_start(self, process_name: str, game_type: str):
         """
         Callback for when a game process starts.
@@ -68,8 +423,8 @@ class KillProcessor:
             if not queue_status["is_empty"]:
                 logger.info(f"📋 Processing {queue_status['queue_size']} queued video(s) now that {process_name} has closed")
                 try:
-                    # Use the method without queue logic to avoid recursion
-                    processed_videos = self.video_queue.process_all_queued(self._process_video_without_queue)
+                    # Process the whole queue as one concurrent batch on the shared loop
+                    processed_videos = self._run_coroutine(self._drain_queue_async())
                     if processed_videos:
                         logger.info(f"✓ Successfully processed {len(processed_videos)} queued video(s)")
                     else:
@@ -79,6 +434,62 @@ class KillProcessor:
             else:
                 logger.info("📋 No videos in queue to process")
     
+    def _record_watch_tokens(self, token_data: Dict[str, Any]):
+        """
+        Track a watch mode token record and queue it for the CSV.
+        
+        Records are written by the background flusher, or immediately once
+        TOKEN_CSV_FLUSH_ROWS are waiting.
+        """
+        with self._token_csv_lock:
+            self.watch_mode_token_data.append(token_data)
+            self._token_csv_buffer.append(token_data)
+            if len(self._token_csv_buffer) < TOKEN_CSV_FLUSH_ROWS:
+                return
+        self._flush_token_csv()
+    
+    def _flush_token_csv(self):
+        """Write any buffered watch mode token records to the CSV."""
+        with self._token_csv_lock:
+            rows, self._token_csv_buffer = self._token_csv_buffer, []
+            if not rows or not self.watch_mode_csv_path:
+                return
+            try:
+                append_token_rows_to_csv(rows, self.watch_mode_csv_path)
+            except Exception as e:
+                logger.error(f"Failed to log token data: {str(e)}")
+    
+    def _start_token_flusher(self):
+        """Start the thread that periodically writes buffered token records."""
+        def flush_periodically():
+            while not self._token_flush_stop.wait(TOKEN_CSV_FLUSH_SECONDS):
+                self._flush_token_csv()
+        
+        self._token_flush_stop.clear()
+        self._token_flush_thread = threading.Thread(
+            target=flush_periodically,
+            name="TokenCsvFlusher",
+            daemon=True
+        )
+        self._token_flush_thread.start()
+    
+    def _stop_token_flusher(self):
+        """Stop the flusher thread and write whatever is still buffered."""
+        if self._token_flush_thread is not None:
+            self._token_flush_stop.set()
+            self._token_flush_thread.join()
+            self._token_flush_thread = None
+        self._flush_token_csv()
+    
+    async def _drain_queue_async(self) -> List[str]:
+        """
+        Process every queued video concurrently, bypassing the queue check.
+        
+        Returns:
+            List of paths to created compilation videos
+        """
+        return await self.process_multiple_videos(self.video_queue.drain())
+    
     def cleanup_uploaded_files(self) -> bool:
         """
         Clean up all uploaded files from Gemini's Files API.
@@ -87,17 +498,17 @@ class KillProcessor:
             True if cleanup was successful, False otherwise
         """
         try:
-            import dotenv
-            dotenv.load_dotenv()
-            api_key = os.getenv("GOOGLE_API_KEY")
+            api_key = get_api_key()
             
             if not api_key:
                 logger.warning("GOOGLE_API_KEY not found, skipping file cleanup")
                 return False
             
             logger.info("Cleaning up uploaded files from Gemini Files API...")
-            file_deleter = FileDeleter(api_key=api_key)
-            file_deleter.delete_all_files()
+            forget_uploaded_files()
+            if self._file_deleter is None:
+                self._file_deleter = FileDeleter(api_key=api_key)
+            self._file_deleter.delete_all_files()
             logger.info("✓ File cleanup completed")
             return True
             
@@ -105,6 +516,52 @@ class KillProcessor:
             logger.error(f"Error during file cleanup: {str(e)}")
             return False
     
+    def _get_kills_data(self, output_file: str = "exported_metadata/kills.json") -> Dict[str, Any]:
+        """
+        Return the parsed analysis file, re-reading it only when it changes.
+        
+        Args:
+            output_file: Path to the JSON file containing previous analyses
+            
+        Returns:
+            Parsed file contents, or an empty dictionary if the file does not exist
+        """
+        entry = _load_kills_entry(output_file)
+        return entry[2] if entry else {}
+    
+    def _write_kills_data(self, data: Dict[str, Any], output_file: str = KILLS_FILE):
+        """
+        Write the analysis file and cache what was written.
+        
+        Args:
+            data: Full contents of the analysis file
+            output_file: Path to the JSON file containing previous analyses
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        json_io.dump_file(output_file, data)
+        _store_kills_entry(output_file, data)
+    
+    def _load_highlights_index(self, output_file: str = "exported_metadata/kills.json") -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Index the analysis file's highlights by source video filename.
+        
+        The index is built once per version of the file and shared with
+        the parsed data cache.
+        
+        Args:
+            output_file: Path to the JSON file containing previous analyses
+            
+        Returns:
+            Dictionary mapping video filenames to their highlight dictionaries
+        """
+        try:
+            entry = _load_kills_entry(output_file)
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.warning(f"Error reading {output_file}: {e}")
+            return {}
+        
+        return entry[3] if entry else {}
+    
     def is_video_already_analyzed(self, video_path: str, output_file: str = "exported_metadata/kills.json") -> bool:
         """
         Check if a video has already been analyzed by looking in the kills.json file.
@@ -116,100 +573,135 @@ class KillProcessor:
         Returns:
             True if video was already analyzed, False otherwise
         """
-        if not os.path.exists(output_file):
-            return False
+        video_filename = _basename(video_path)
         
-        try:
-            with open(output_file, 'r') as f:
-                data = json.load(f)
-            
-            # Check if any highlights exist for this video
-            if "highlights" in data:
-                video_filename = Path(video_path).name
-                for highlight in data["highlights"]:
-                    source_filename = Path(highlight.get("source_video", "")).name
-                    if source_filename == video_filename:
+        # Very large files that aren't cached yet are streamed, stopping at the
+        # first match, instead of being loaded into memory whole
+        if ijson is not None and output_file not in _kills_cache:
+            try:
+                file_size = os.stat(output_file).st_size
+            except FileNotFoundError:
+                return False
+            if file_size >= STREAM_SCAN_MIN_BYTES:
+                found = self._stream_find_video(video_filename, output_file)
+                if found is not None:
+                    if found:
                         logger.debug(f"Video {video_filename} already analyzed (found in {output_file})")
-                        return True
-                        
-            return False
+                    return found
+        
+        if video_filename in self._load_highlights_index(output_file):
+            logger.debug(f"Video {video_filename} already analyzed (found in {output_file})")
+            return True
+        return False
+    
+    def _stream_find_video(self, video_filename: str, output_file: str) -> Optional[bool]:
+        """
+        Stream the analysis file's highlights looking for a video filename.
+        
+        Only the source_video strings are decoded, so no highlight objects
+        are built, and the scan stops at the first match.
+        
+        Args:
+            video_filename: Filename of the video to look for
+            output_file: Path to the JSON file containing previous analyses
             
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.warning(f"Error reading {output_file}: {e}")
+        Returns:
+            True or False, or None if the file couldn't be streamed
+        """
+        try:
+            with open(output_file, 'rb') as f:
+                for source_video in ijson.items(f, 'highlights.item.source_video'):
+                    if _basename(source_video) == video_filename:
+                        return True
             return False
+        except (OSError, ijson.JSONError) as e:
+            logger.warning(f"Error streaming {output_file}: {e}")
+            return None
     
-    async def process_single_video(self, video_path: str) -> Optional[str]:
+    async def process_single_video(self, video_path: str, analysis_slots: Optional[asyncio.Semaphore] = None) -> Optional[str]:
         """
         Process a single video to find kills and create compilation.
         
         Args:
             video_path: Path to the video file
+            analysis_slots: Semaphore bounding concurrent Gemini analyses,
+                held only for the analysis step
             
         Returns:
             Path to the created compilation video or None if no kills found
         """
         token_usage = None
+        # Settings read once rather than on every retry
+        config = self.config
+        reprocess = config.reprocess_analyzed_videos
+        base_temperature = config.temperature
         try:
             # Skip if already processed (unless reprocessing is enabled)
-            if not self.config.reprocess_analyzed_videos and video_path in self.processed_videos:
-                logger.info(f"Skipping already processed video: {Path(video_path).name}")
+            if not reprocess and self._is_processed(video_path):
+                logger.info("Skipping already processed video: %s", _basename(video_path))
                 return None
             
             # Check if video was already analyzed in kills.json
-            if not self.config.reprocess_analyzed_videos and self.is_video_already_analyzed(video_path):
-                logger.info(f"Skipping already analyzed video: {Path(video_path).name}")
-                self.processed_videos.add(video_path)
+            if not reprocess and self.is_video_already_analyzed(video_path):
+                logger.info("Skipping already analyzed video: %s", _basename(video_path))
+                self._mark_processed(video_path)
                 return None
             
-            logger.info(f"Processing video: {Path(video_path).name}")
+            logger.info("Processing video: %s", _basename(video_path))
             
             # Retry logic for zero highlights with temperature escalation
-            max_retries = self.config.max_zero_highlight_retries
+            max_retries = config.max_zero_highlight_retries
             retry_count = 0
             highlights = None
-            current_temperature = self.config.temperature
+            current_temperature = base_temperature
             
-            while retry_count <= max_retries:
-                try:
-                    # Analyze video using kills prompt with current temperature
-                    highlights, token_usage = await analyze_video(
-                        video_path=video_path,
-                        output_file="exported_metadata/kills.json",
-                        temperature=current_temperature
-                    )
-                    
-                    # Add timestamp and game type to token usage
-                    if token_usage:
-                        token_usage["timestamp"] = datetime.now().isoformat()
-                        token_usage["game_type"] = self.config.game_type
-                        token_usage["cached_tokens"] = token_usage.get("cached_tokens", 0)
-                    
-                    # If we got highlights, break out of retry loop
-                    if highlights:
-                        if current_temperature > self.config.temperature:
-                            logger.info(f"✓ Found {len(highlights)} highlight(s) in {Path(video_path).name} with increased temperature: {current_temperature:.1f}")
-                        break
+            # Hold an analysis slot only while talking to Gemini, so this
+            # video's compilation overlaps with the next video's analysis
+            async with analysis_slots or nullcontext():
+                while retry_count <= max_retries:
+                    try:
+                        # Analyze video using kills prompt with current temperature
+                        highlights, token_usage = await analyze_video(
+                            video_path=video_path,
+                            output_file=KILLS_FILE,
+                            read_existing=self._get_kills_data,
+                            write_back=self._write_kills_data,
+                            temperature=current_temperature
+                        )
                         
-                    # If no highlights and we have retries left
-                    if retry_count < max_retries:
-                        retry_count += 1
-                        # Increase temperature by 0.1 for next attempt
-                        current_temperature += 0.1
-                        logger.info(f"No highlights found in {Path(video_path).name}, retrying ({retry_count}/{max_retries}) with increased temperature: {current_temperature:.1f}")
-                        await asyncio.sleep(self.config.retry_delay_seconds)
-                    else:
-                        logger.info(f"No highlights found in {Path(video_path).name} after {max_retries} retries")
+                        # Add timestamp and game type to token usage
+                        if token_usage:
+                            token_usage["timestamp_ns"] = time.time_ns()
+                            token_usage["game_type"] = config.game_type
+                            token_usage["cached_tokens"] = token_usage.get("cached_tokens", 0)
                         
-                except Exception as e:
-                    logger.error(f"Error analyzing video {video_path} (attempt {retry_count + 1}): {str(e)}")
-                    if retry_count < max_retries:
-                        retry_count += 1
-                        # Also increase temperature on error retries
-                        current_temperature += 0.1
-                        logger.info(f"Retrying with increased temperature: {current_temperature:.1f}")
-                        await asyncio.sleep(self.config.retry_delay_seconds)
-                    else:
-                        raise
+                        # If we got highlights, break out of retry loop
+                        if highlights:
+                            if current_temperature > base_temperature:
+                                logger.info("✓ Found %s highlight(s) in %s with increased temperature: %.1f", len(highlights), _basename(video_path), current_temperature)
+                            break
+                            
+                        # If no highlights and we have retries left
+                        if retry_count < max_retries and await asyncio.to_thread(self._can_hold_highlight, video_path):
+                            retry_count += 1
+                            # Increase temperature by 0.1 for next attempt
+                            current_temperature += 0.1
+                            logger.info("No highlights found in %s, retrying (%s/%s) with increased temperature: %.1f", _basename(video_path), retry_count, max_retries, current_temperature)
+                            await asyncio.sleep(self._retry_delay(retry_count))
+                        else:
+                            logger.info("No highlights found in %s after %s retries", _basename(video_path), retry_count)
+                            break
+                            
+                    except Exception as e:
+                        logger.error("Error analyzing video %s (attempt %s): %s", video_path, retry_count + 1, e)
+                        if retry_count < max_retries and _is_retryable(e):
+                            retry_count += 1
+                            # Also increase temperature on error retries
+                            current_temperature += 0.1
+                            logger.info("Retrying with increased temperature: %.1f", current_temperature)
+                            await asyncio.sleep(self._retry_delay(retry_count))
+                        else:
+                            raise
             
             # Handle token tracking for watch mode
             if token_usage and self.watch_mode_csv_path:
@@ -217,61 +709,62 @@ class KillProcessor:
                     # Log token costs for watch mode
                     cost = token_usage.get("cost", 0.0)
                     total_tokens = token_usage.get("total_tokens", 0)
-                    logger.info(f"💰 Token cost for {Path(video_path).name}: ${cost:.4f} ({total_tokens:,} tokens)")
+                    logger.info("💰 Token cost for %s: $%.4f (%d tokens)", _basename(video_path), cost, total_tokens)
                     
-                    # Append to CSV and in-memory tracking
-                    append_token_data_to_csv(token_usage, self.watch_mode_csv_path)
-                    self.watch_mode_token_data.append(token_usage)
+                    # Queue for the CSV and add to in-memory tracking
+                    self._record_watch_tokens(token_usage)
                 except Exception as e:
-                    logger.error(f"Failed to track tokens for watch mode: {str(e)}")
+                    logger.error("Failed to track tokens for watch mode: %s", e)
             
             if not highlights:
-                logger.info(f"No kills found in {Path(video_path).name}")
-                self.processed_videos.add(video_path)
+                logger.info("No kills found in %s", _basename(video_path))
+                self._mark_processed(video_path)
                 return None
             
-            logger.info(f"Found {len(highlights)} kill(s) in {Path(video_path).name}")
+            logger.info("Found %s kill(s) in %s", len(highlights), _basename(video_path))
             
             # Process video to create compilation
-            compilation_path = self.video_processor.process_video_highlights(video_path, highlights)
+            compilation_path = await self._compile_highlights(video_path, highlights)
             
             if compilation_path:
-                logger.info(f"✓ Created kill compilation: {Path(compilation_path).name}")
-                self.processed_videos.add(video_path)
+                logger.info("✓ Created kill compilation: %s", _basename(compilation_path))
+                self._mark_processed(video_path)
                 return compilation_path
             else:
-                logger.error(f"Failed to create compilation for {Path(video_path).name}")
+                logger.error("Failed to create compilation for %s", _basename(video_path))
                 return None
                 
         except Exception as e:
-            logger.error(f"Error processing video {video_path}: {str(e)}")
+            logger.error("Error processing video %s: %s", video_path, e)
             
             # Track failed processing for watch mode
             if self.watch_mode_csv_path:
-                error_token_data = {
-                    "video": video_path,
-                    "status": "error",
-                    "model_name": self.config.model_name,
-                    "game_type": self.config.game_type,
-                    "thinking_mode": True,  # We use thinking mode
-                    "prompt_tokens": 0,
-                    "completion_tokens": 0,
-                    "cached_tokens": 0,
-                    "total_tokens": 0,
-                    "cost": 0.0,
-                    "timestamp": datetime.now().isoformat()
-                }
+                error_token_data = _zero_token_record(video_path, "error", self.config.model_name, self.config.game_type)
                 
-                try:
-                    append_token_data_to_csv(error_token_data, self.watch_mode_csv_path)
-                    self.watch_mode_token_data.append(error_token_data)
-                except Exception as csv_error:
-                    logger.error(f"Failed to log error token data: {str(csv_error)}")
+                self._record_watch_tokens(error_token_data)
             
             return None
     
-    def process_single_video_sync(self, video_path: str) -> Optional[str]:
-        """Synchronous wrapper for process_single_video."""
+    def process_single_video_sync(self, video_path: str, cleanup: bool = True) -> Optional[str]:
+        """
+        Synchronous wrapper for process_single_video.
+        
+        Args:
+            video_path: Path to the video file
+            cleanup: Delete uploaded files after a successful run. Callers
+                processing several videos at once should pass False and clean
+                up once at the end, since cleanup removes every upload.
+        """
+        # Skip videos that were already handled before queueing or touching
+        # the event loop
+        if not self.config.reprocess_analyzed_videos:
+            if self._is_processed(video_path):
+                logger.info(f"Skipping already processed video: {_basename(video_path)}")
+                return None
+            if self.is_video_already_analyzed(video_path):
+                logger.info(f"Skipping already analyzed video: {_basename(video_path)}")
+                self._mark_processed(video_path)
+                return None
         
         # Check if we should queue the video instead of processing immediately
         if (self.config.queue_when_gaming and 
@@ -291,22 +784,103 @@ class KillProcessor:
                 position = self.video_queue.add_video(video_path, game_name)
                 return None  # Return None to indicate video was queued, not processed
             except Exception as e:
-                logger.error(f"📋 Failed to queue video {Path(video_path).name}: {str(e)}")
+                logger.error(f"📋 Failed to queue video {_basename(video_path)}: {str(e)}")
                 # Fall through to normal processing if queueing fails
         
         # Normal processing logic
-        return self._process_video_without_queue(video_path)
+        return self._process_video_without_queue(video_path, cleanup)
     
-    def _process_video_without_queue(self, video_path: str) -> Optional[str]:
+    def _process_video_without_queue(self, video_path: str, cleanup: bool = True) -> Optional[str]:
         """Process a video without any queue logic - used for both normal processing and queue processing."""
-        result = asyncio.run(self.process_single_video(video_path))
+        result = self._run_coroutine(self.process_single_video(video_path))
         
         # Clean up uploaded files after single video processing
-        if result:  # Only cleanup if processing was successful
+        if result and cleanup:  # Only cleanup if processing was successful
             self.cleanup_uploaded_files()
             
         return result
     
+    def _retry_delay(self, retry_count: int) -> float:
+        """Backoff delay before a video's retry_count-th analysis retry."""
+        return _backoff_delay(
+            self.config.retry_delay_seconds,
+            retry_count - 1,
+            max_delay=self.config.max_retry_delay_seconds
+        )
+    
+    async def _gather_limited(self, coroutine_function, argument_tuples: List[tuple]) -> List[Any]:
+        """
+        Run a video coroutine function over many argument tuples, analyzing
+        batch_size videos at a time.
+        
+        Each call gets a shared semaphore as analysis_slots and holds it only
+        while analyzing, so a new analysis starts as soon as any running one
+        finishes and compilations (bounded by the compilation pool) overlap
+        with later analyses instead of occupying a slot.
+        
+        Args:
+            coroutine_function: Async function to call; must accept an
+                analysis_slots keyword argument
+            argument_tuples: Positional arguments for each call
+            
+        Returns:
+            Result or raised exception of each call, in input order
+        """
+        semaphore = asyncio.Semaphore(self.config.batch_size)
+        return await asyncio.gather(
+            *(coroutine_function(*args, analysis_slots=semaphore) for args in argument_tuples),
+            return_exceptions=True
+        )
+    
+    def _can_hold_highlight(self, video_path: str) -> bool:
+        """
+        Check whether a video is long enough to contain a highlight.
+        
+        Clips shorter than min_highlight_duration_seconds can't produce a
+        valid highlight, so retrying them at a higher temperature is wasted.
+        Uses the cached ffprobe result; unknown durations count as long enough.
+        
+        Args:
+            video_path: Path to the video file
+            
+        Returns:
+            False if the video is known to be too short, True otherwise
+        """
+        duration = VideoProcessor.media_duration(self.video_processor.get_media_info(video_path))
+        if duration is not None and duration < self.config.min_highlight_duration_seconds:
+            logger.info(f"{_basename(video_path)} is only {duration:.1f}s long, not retrying for highlights")
+            return False
+        return True
+    
+    def _filter_unprocessed(self, video_paths: List[str]) -> List[str]:
+        """
+        Drop videos that were already processed or analyzed.
+        
+        The analysis file is indexed once for the whole list, so skipped
+        videos never reach process_single_video.
+        
+        Args:
+            video_paths: List of paths to video files
+            
+        Returns:
+            Paths that still need processing, in their original order
+        """
+        analyzed_names = self._load_highlights_index(KILLS_FILE)
+        pending = []
+        for video_path in video_paths:
+            if self._is_processed(video_path):
+                logger.debug(f"Skipping already processed video: {_basename(video_path)}")
+            elif _basename(video_path) in analyzed_names:
+                logger.debug(f"Skipping already analyzed video: {_basename(video_path)}")
+                self._mark_processed(video_path)
+            else:
+                pending.append(video_path)
+        
+        skipped = len(video_paths) - len(pending)
+        if skipped:
+            logger.info(f"Skipping {skipped} already processed video(s)")
+        return pending
+    
     async def process_multiple_videos(self, video_paths: List[str]) -> List[str]:
         """
         Process multiple videos concurrently.
@@ -321,34 +895,34 @@ class KillProcessor:
             logger.warning("No videos to process")
             return []
         
+        if not self.config.reprocess_analyzed_videos:
+            video_paths = self._filter_unprocessed(video_paths)
+            if not video_paths:
+                logger.info("All videos were already processed")
+                return []
+        
         logger.info(f"Processing {len(video_paths)} video(s)")
         
-        # Process videos in batches based on config
-        batch_size = self.config.batch_size
-        results = []
+        all_results = await self._gather_limited(
+            self.process_single_video,
+            [(video_path,) for video_path in video_paths]
+        )
         
-        for i in range(0, len(video_paths), batch_size):
-            batch = video_paths[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1} ({len(batch)} videos)")
-            
-            # Process batch concurrently
-            batch_results = await asyncio.gather(
-                *(self.process_single_video(video_path) for video_path in batch),
-                return_exceptions=True
-            )
-            
-            # Filter successful results
-            for result in batch_results:
-                if isinstance(result, str):  # Successful compilation path
-                    results.append(result)
-                elif isinstance(result, Exception):
-                    logger.error(f"Batch processing error: {str(result)}")
+        # Filter successful results
+        results = []
+        for result in all_results:
+            if isinstance(result, str):  # Successful compilation path
+                results.append(result)
+            elif isinstance(result, Exception):
+                logger.error(f"Batch processing error: {str(result)}")
         
         logger.info(f"✓ Successfully processed {len(results)} video(s)")
         
-        # Clean up uploaded files after batch processing
+        # Clean up uploaded files after batch processing, off the event loop.
+        # Awaited rather than run in the background: delete_all_files removes
+        # every upload, including ones the next batch may already be making
         if results:  # Only cleanup if we processed any videos
-            self.cleanup_uploaded_files()
+            await asyncio.to_thread(self.cleanup_uploaded_files)
         
         return results
     
@@ -376,6 +950,7 @@ class KillProcessor:
             
             # Create empty CSV with headers
             export_token_data_to_csv([], "watch", self.watch_mode_start_time)
+            self._start_token_flusher()
             logger.info(f"📊 Token tracking initialized for watch mode: {csv_filename}")
         except Exception as e:
             logger.error(f"Failed to initialize token tracking CSV: {str(e)}")
@@ -423,6 +998,9 @@ class KillProcessor:
             if self.process_monitor:
                 self.process_monitor.stop_monitoring()
             
+            self.close()
+            self._stop_token_flusher()
+            
             # Log final token summary for watch mode
             if self.watch_mode_token_data:
                 logger.info("📊 Watch mode completed - generating final token summary")
@@ -450,25 +1028,9 @@ class KillProcessor:
             
             # Track failed processing
             if self.watch_mode_csv_path:
-                error_token_data = {
-                    "video": video_path,
-                    "status": "error",
-                    "model_name": self.config.model_name,
-                    "game_type": self.config.game_type,
-                    "thinking_mode": True,  # We use thinking mode
-                    "prompt_tokens": 0,
-                    "completion_tokens": 0,
-                    "cached_tokens": 0,
-                    "total_tokens": 0,
-                    "cost": 0.0,
-                    "timestamp": datetime.now().isoformat()
-                }
+                error_token_data = _zero_token_record(video_path, "error", self.config.model_name, self.config.game_type)
                 
-                try:
-                    append_token_data_to_csv(error_token_data, self.watch_mode_csv_path)
-                    self.watch_mode_token_data.append(error_token_data)
-                except Exception as csv_error:
-                    logger.error(f"Failed to log error token data: {str(csv_error)}")
+                self._record_watch_tokens(error_token_data)
             
             return None
     
@@ -482,63 +1044,28 @@ class KillProcessor:
         Returns:
             List of paths to created compilation videos
         """
-        directory = Path(directory_path)
-        if not directory.exists():
+        if not os.path.isdir(directory_path):
             raise FileNotFoundError(f"Directory not found: {directory_path}")
         
-        # Find all video files
-        video_extensions = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv')
-        video_files = []
-        
-        for ext in video_extensions:
-            video_files.extend(directory.rglob(f"*{ext}"))
-            video_files.extend(directory.rglob(f"*{ext.upper()}"))
+        # Find all video files in a single walk, matching extensions case-insensitively
+        video_paths = list(iter_video_files(directory_path, DIRECTORY_VIDEO_EXTENSIONS))
         
-        if not video_files:
+        if not video_paths:
             logger.warning(f"No video files found in {directory_path}")
             return []
         
-        logger.info(f"Found {len(video_files)} video file(s) in {directory_path}")
-        
-        # Convert to string paths
-        video_paths = [str(video_file) for video_file in video_files]
+        logger.info(f"Found {len(video_paths)} video file(s) in {directory_path}")
         
         # Process videos
-        results = asyncio.run(self.process_multiple_videos(video_paths))
+        results = self._run_coroutine(self.process_multiple_videos(video_paths))
         
         # Note: cleanup is already handled in process_multiple_videos
         return results
     
     def create_config_template(self, config_path: str = "config.json"):
         """Create a config template for kill processing."""
-        template_config = {
-            "batch_size": 5,
-            "model_name": "gemini-2.5-flash-preview-04-17",
-            "max_retries": 10,
-            "retry_delay_seconds": 2,
-            "min_highlight_duration_seconds": 5,
-            "username": "your_username_here",
-            "temperature": 1.0,
-            "use_caching": True,
-            "cache_ttl_seconds": 3600,
-            "game_type": "kills",
-            "max_zero_highlight_retries": 3,
-            "make_short": False,
-            "shorts": {
-                "no_webcam": False,
-                "add_subtitles": False
-            },
-            "folder_watcher": {
-                "watch_directory": "./videos",
-                "polling_interval_seconds": 2,
-                "process_immediately": True,
-                "reprocess_analyzed_videos": False
-            }
-        }
-        
-        import json
         with open(config_path, 'w') as f:
-            json.dump(template_config, f, indent=2)
+            f.write(_CONFIG_TEMPLATE_JSON)
         
         logger.info(f"Created config template at: {config_path}")
         logger.info("Please update the 'username' field and adjust other settings as needed.")
@@ -554,27 +1081,8 @@ class KillProcessor:
         Returns:
             List of highlight dictionaries for the video
         """
-        if not os.path.exists(output_file):
-            return []
-        
-        try:
-            with open(output_file, 'r') as f:
-                data = json.load(f)
-            
-            if "highlights" in data:
-                video_filename = Path(video_path).name
-                video_highlights = []
-                for highlight in data["highlights"]:
-                    source_filename = Path(highlight.get("source_video", "")).name
-                    if source_filename == video_filename:
-                        video_highlights.append(highlight)
-                return video_highlights
-                        
-            return []
-            
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.warning(f"Error reading {output_file}: {e}")
-            return []
+        index = self._load_highlights_index(output_file)
+        return list(index.get(_basename(video_path), []))
     
     def remove_video_from_analysis(self, video_path: str, output_file: str = "exported_metadata/kills.json") -> bool:
         """
@@ -587,38 +1095,54 @@ class KillProcessor:
         Returns:
             True if removal was successful, False otherwise
         """
-        if not os.path.exists(output_file):
-            return True  # Nothing to remove
+        return self.remove_videos_from_analysis([video_path], output_file)
+    
+    def remove_videos_from_analysis(self, video_paths: List[str], output_file: str = "exported_metadata/kills.json") -> bool:
+        """
+        Remove all highlights for several videos from the JSON file.
+        
+        The file is filtered and rewritten once for the whole list, and not
+        at all when none of the videos have highlights in it.
+        
+        Args:
+            video_paths: Paths to the video files
+            output_file: Path to the JSON file containing previous analyses
+            
+        Returns:
+            True if removal was successful, False otherwise
+        """
+        if not video_paths:
+            return True
         
         try:
-            with open(output_file, 'r') as f:
-                data = json.load(f)
+            data = self._get_kills_data(output_file)
+            video_filenames = {_basename(video_path) for video_path in video_paths}
             
-            if "highlights" in data:
-                video_filename = Path(video_path).name
+            if "highlights" in data and not video_filenames.isdisjoint(self._load_highlights_index(output_file)):
                 original_count = len(data["highlights"])
                 
-                # Filter out highlights for this video
+                # Filter out highlights for these videos into a new object so the
+                # cached copy stays valid if the write fails
+                data = dict(data)
                 data["highlights"] = [
                     highlight for highlight in data["highlights"]
-                    if Path(highlight.get("source_video", "")).name != video_filename
+                    if _source_basename(highlight) not in video_filenames
                 ]
                 
                 removed_count = original_count - len(data["highlights"])
                 
-                # Write back to file
-                with open(output_file, 'w') as f:
-                    json.dump(data, f, indent=2)
+                # Write back to file, caching what was written
+                self._write_kills_data(data, output_file)
                 
-                if removed_count > 0:
-                    logger.info(f"Removed {removed_count} highlight(s) for {video_filename} from {output_file}")
-                
-                return True
+                logger.info(f"Removed {removed_count} highlight(s) for {len(video_filenames)} video(s) from {output_file}")
+            
+            # Let the videos be processed again after their analysis is removed
+            self._unmark_processed(video_paths)
             
             return True
             
         except (json.JSONDecodeError, KeyError, IOError) as e:
-            logger.error(f"Error removing video from analysis file {output_file}: {e}")
+            logger.error(f"Error removing videos from analysis file {output_file}: {e}")
             return False
     
     def process_selected_videos_loop(self) -> List[str]:
@@ -630,10 +1154,14 @@ class KillProcessor:
         Returns:
             List of paths to all created compilation videos across all batches
         """
+        # Imported here so watch and directory runs never load tkinter
+        from utils.file_selector import FileSelector
+        
         file_selector = FileSelector()
         all_results = []
         select_mode_token_data = []
         select_mode_start_time = datetime.now()
+        select_mode_csv_path: Optional[str] = None
         
         try:
             while True:
@@ -644,21 +1172,25 @@ class KillProcessor:
                 
                 if batch_token_data:
                     select_mode_token_data.extend(batch_token_data)
+                    # Write the batch's token records in one go so they survive
+                    # a crash in a later batch
+                    try:
+                        if select_mode_csv_path is None:
+                            select_mode_csv_path = export_token_data_to_csv(batch_token_data, "select", select_mode_start_time)
+                        else:
+                            append_token_rows_to_csv(batch_token_data, select_mode_csv_path)
+                    except Exception as e:
+                        logger.error(f"Failed to export token data for select mode: {str(e)}")
                 
                 # Ask if user wants to process more videos
                 if not file_selector.confirm_continue_processing():
                     break
             
-            # Export token data to CSV for select mode
+            # Log token summary for select mode
             if select_mode_token_data:
-                try:
-                    csv_path = export_token_data_to_csv(select_mode_token_data, "select", select_mode_start_time)
-                    logger.info(f"📊 Token usage data exported to: {Path(csv_path).name}")
-                    
-                    # Log summary
-                    log_token_summary(select_mode_token_data)
-                except Exception as e:
-                    logger.error(f"Failed to export token data for select mode: {str(e)}")
+                if select_mode_csv_path:
+                    logger.info(f"📊 Token usage data exported to: {_basename(select_mode_csv_path)}")
+                log_token_summary(select_mode_token_data)
             
             return all_results
             
@@ -668,6 +1200,7 @@ class KillProcessor:
             return all_results
         finally:
             file_selector.cleanup()
+            self.close()
     
     def _process_single_batch_with_tokens(self, file_selector) -> tuple[List[str], List[Dict[str, Any]]]:
         """
@@ -702,72 +1235,74 @@ class KillProcessor:
             file_selector.show_info("No Selection", "No prompt types were selected.")
             return [], []
         
+        # Previous analyses indexed by filename, loaded once for the whole batch
+        highlights_index = self._load_highlights_index()
+        
         # Process each selected file
         videos_to_reanalyze = []
         videos_to_use_existing = []
         video_game_type_pairs = []
+        confirmed_pairs = []
         
+        default_game_type = self.config.game_type
         for video_path in selected_files:
-            game_type = prompt_types.get(video_path, self.config.game_type)
+            game_type = prompt_types.get(video_path, default_game_type)
             
             # Check if video was already analyzed
-            if self.is_video_already_analyzed(video_path):
+            if _basename(video_path) in highlights_index:
                 # Ask for confirmation to re-analyze
                 if file_selector.confirm_reanalysis(video_path):
-                    logger.info(f"User confirmed re-analysis for {Path(video_path).name}")
-                    # Remove existing analysis before re-analyzing
-                    if self.remove_video_from_analysis(video_path):
-                        videos_to_reanalyze.append(video_path)
-                        video_game_type_pairs.append((video_path, game_type))
-                    else:
-                        logger.error(f"Failed to remove existing analysis for {Path(video_path).name}")
+                    logger.info("User confirmed re-analysis for %s", _basename(video_path))
+                    confirmed_pairs.append((video_path, game_type))
                 else:
-                    logger.info(f"User chose to use existing analysis for {Path(video_path).name}")
+                    logger.info("User chose to use existing analysis for %s", _basename(video_path))
                     videos_to_use_existing.append(video_path)
+            elif self._is_processed(video_path):
+                # Processed before but produced no highlights; ask rather than skip it silently
+                if file_selector.confirm_reanalysis(video_path):
+                    logger.info("User confirmed re-analysis for %s", _basename(video_path))
+                    self._unmark_processed([video_path])
+                    videos_to_reanalyze.append(video_path)
+                    video_game_type_pairs.append((video_path, game_type))
+                else:
+                    logger.info("Skipping %s, already processed with no highlights", _basename(video_path))
             else:
                 # Video not analyzed before, add to re-analysis list
                 videos_to_reanalyze.append(video_path)
                 video_game_type_pairs.append((video_path, game_type))
         
+        # Remove existing analyses for all confirmed videos in one rewrite
+        if confirmed_pairs:
+            if self.remove_videos_from_analysis([video_path for video_path, _ in confirmed_pairs]):
+                for video_path, game_type in confirmed_pairs:
+                    videos_to_reanalyze.append(video_path)
+                    video_game_type_pairs.append((video_path, game_type))
+            else:
+                logger.error(f"Failed to remove existing analysis for {len(confirmed_pairs)} video(s)")
+        
         # Process videos that need re-analysis with their specific game types
         if video_game_type_pairs:
             logger.info(f"Re-analyzing {len(video_game_type_pairs)} video(s) with custom game types")
-            reanalysis_results, reanalysis_tokens = asyncio.run(self.process_multiple_videos_with_game_types_and_tokens(video_game_type_pairs))
+            # Already vetted above, so don't let the processed filter drop explicit picks
+            reanalysis_results, reanalysis_tokens = self._run_coroutine(
+                self.process_multiple_videos_with_game_types_and_tokens(video_game_type_pairs, skip_processed=False)
+            )
             results.extend(reanalysis_results)
             token_data.extend(reanalysis_tokens)
         
         # Process videos using existing analysis (no token cost for these)
         if videos_to_use_existing:
             logger.info(f"Creating compilations from existing analysis for {len(videos_to_use_existing)} video(s)")
-            for video_path in videos_to_use_existing:
-                existing_highlights = self.get_existing_highlights(video_path)
-                if existing_highlights:
-                    logger.info(f"Found {len(existing_highlights)} existing highlight(s) for {Path(video_path).name}")
-                    # Create compilation using existing highlights
-                    compilation_path = self.video_processor.process_video_highlights(video_path, existing_highlights)
-                    if compilation_path:
-                        logger.info(f"✓ Created compilation from existing analysis: {Path(compilation_path).name}")
-                        results.append(compilation_path)
-                        
-                        # Add token data entry for existing analysis (no cost)
-                        existing_token_data = {
-                            "video": video_path,
-                            "status": "existing_analysis",
-                            "model_name": self.config.model_name,
-                            "game_type": prompt_types.get(video_path, self.config.game_type),
-                            "thinking_mode": False,  # No thinking mode used for existing analysis
-                            "prompt_tokens": 0,
-                            "completion_tokens": 0,
-                            "cached_tokens": 0,
-                            "total_tokens": 0,
-                            "cost": 0.0,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                        token_data.append(existing_token_data)
-                    else:
-                        logger.error(f"Failed to create compilation from existing analysis for {Path(video_path).name}")
-                else:
-                    logger.warning(f"No existing highlights found for {Path(video_path).name}")
+            compilation_paths = self._run_coroutine(self._compile_from_existing(videos_to_use_existing, highlights_index))
+            model_name = self.config.model_name
+            for video_path, compilation_path in zip(videos_to_use_existing, compilation_paths):
+                if compilation_path:
+                    logger.info("✓ Created compilation from existing analysis: %s", _basename(compilation_path))
+                    results.append(compilation_path)
+                    
+                    # Add token data entry for existing analysis (no cost)
+                    existing_token_data = _zero_token_record(video_path, "existing_analysis", model_name, prompt_types.get(video_path, default_game_type), thinking_mode=False)
+                    token_data.append(existing_token_data)
         
         if not results:
             logger.info("No videos were processed successfully")
@@ -776,7 +1311,7 @@ class KillProcessor:
         
         # Show completion message for this batch
         success_count = len(results)
-        total_cost = sum(data.get("cost", 0.0) for data in token_data)
+        total_cost = total_token_cost(token_data)
         message = f"Successfully processed {success_count} video(s) in this batch!\n\nCompilations saved to: exported_videos/"
         if total_cost > 0:
             message += f"\n\nToken cost for this batch: ${total_cost:.4f}"
@@ -784,12 +1319,70 @@ class KillProcessor:
             message += "\n\nShorts will be created automatically."
         file_selector.show_info("Batch Complete", message)
         
-        # Clean up uploaded files after processing
-        if results:
-            self.cleanup_uploaded_files()
-        
+        # Uploaded files were already cleaned up once by the re-analysis batch
         return results, token_data
 
+    async def _compile_from_existing(self, video_paths: List[str], highlights_index: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Optional[str]]:
+        """
+        Create compilations from previously saved highlights, several at a time.
+        
+        Videos are grouped so each FFmpeg run encodes up to
+        MAX_OUTPUTS_PER_FFMPEG compilations, and groups run in worker threads
+        with the total number of concurrent encodes capped at the smaller of
+        the batch size and the CPU count, and at MAX_OUTPUTS_PER_FFMPEG when
+        NVENC is in use.
+        
+        Args:
+            video_paths: Paths of videos that already have highlights in kills.json
+            highlights_index: Index from _load_highlights_index to look the
+                highlights up in, loaded once here if not provided
+            
+        Returns:
+            Compilation path (or None on failure) for each video, in input order
+        """
+        if highlights_index is None:
+            highlights_index = self._load_highlights_index()
+        
+        video_to_highlights = {}
+        for video_path in video_paths:
+            existing_highlights = list(highlights_index.get(_basename(video_path), []))
+            if existing_highlights:
+                logger.info(f"Found {len(existing_highlights)} existing highlight(s) for {_basename(video_path)}")
+                video_to_highlights[video_path] = existing_highlights
+            else:
+                logger.warning(f"No existing highlights found for {_basename(video_path)}")
+        
+        max_encodes = await asyncio.to_thread(
+            self.video_processor.max_concurrent_encodes,
+            min(self.config.batch_size, os.cpu_count() or 1)
+        )
+        semaphore = asyncio.Semaphore(max(1, max_encodes // MAX_OUTPUTS_PER_FFMPEG))
+        
+        async def compile_group(group: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Optional[str]]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self.video_processor.process_many_video_highlights, group)
+                except Exception as e:
+                    logger.error(f"Error creating compilations: {str(e)}")
+                    return {}
+        
+        items = list(video_to_highlights.items())
+        groups = [
+            dict(items[i:i + MAX_OUTPUTS_PER_FFMPEG])
+            for i in range(0, len(items), MAX_OUTPUTS_PER_FFMPEG)
+        ]
+        compiled: Dict[str, Optional[str]] = {}
+        for group_result in await asyncio.gather(*(compile_group(group) for group in groups)):
+            compiled.update(group_result)
+        
+        compilation_paths = []
+        for video_path in video_paths:
+            compilation_path = compiled.get(video_path)
+            if video_path in video_to_highlights and not compilation_path:
+                logger.error(f"Failed to create compilation from existing analysis for {_basename(video_path)}")
+            compilation_paths.append(compilation_path)
+        return compilation_paths
+    
     def _process_single_batch(self, file_selector) -> List[str]:
         """
         Process a single batch of selected videos (legacy method).
@@ -810,125 +1403,119 @@ class KillProcessor:
         """
         return self.process_selected_videos_loop()
 
-    async def process_single_video_with_game_type(self, video_path: str, game_type: str) -> tuple[Optional[str], Optional[Dict[str, Any]]]:
+    async def process_single_video_with_game_type(self, video_path: str, game_type: str, analysis_slots: Optional[asyncio.Semaphore] = None) -> tuple[Optional[str], Optional[Dict[str, Any]]]:
         """
         Process a single video to find kills and create compilation using a specific game type.
         
+        Unlike process_single_video this doesn't skip processed videos;
+        process_multiple_videos_with_game_types_and_tokens filters the
+        whole batch up front unless the caller already vetted the videos.
+        
         Args:
             video_path: Path to the video file
             game_type: Game type to use for analysis
+            analysis_slots: Semaphore bounding concurrent Gemini analyses,
+                held only for the analysis step
             
         Returns:
             Tuple of (compilation path or None, token usage data or None)
         """
         token_usage = None
+        # Settings read once rather than on every retry
+        config = self.config
+        base_temperature = config.temperature
         try:
-            # Skip if already processed (unless reprocessing is enabled)
-            if not self.config.reprocess_analyzed_videos and video_path in self.processed_videos:
-                logger.info(f"Skipping already processed video: {Path(video_path).name}")
-                return None, None
-            
-            # Check if video was already analyzed in kills.json
-            if not self.config.reprocess_analyzed_videos and self.is_video_already_analyzed(video_path):
-                logger.info(f"Skipping already analyzed video: {Path(video_path).name}")
-                self.processed_videos.add(video_path)
-                return None, None
-            
-            logger.info(f"Processing video: {Path(video_path).name} with game type: {game_type}")
+            logger.info("Processing video: %s with game type: %s", _basename(video_path), game_type)
             
             # Retry logic for zero highlights with temperature escalation
-            max_retries = self.config.max_zero_highlight_retries
+            max_retries = config.max_zero_highlight_retries
             retry_count = 0
             highlights = None
-            current_temperature = self.config.temperature
+            current_temperature = base_temperature
             
-            while retry_count <= max_retries:
-                try:
-                    # Analyze video using specified game type with current temperature
-                    highlights, token_usage = await analyze_video(
-                        video_path=video_path,
-                        output_file="exported_metadata/kills.json",
-                        game_type=game_type,
-                        temperature=current_temperature
-                    )
-                    
-                    # Add timestamp and game type to token usage
-                    if token_usage:
-                        token_usage["timestamp"] = datetime.now().isoformat()
-                        token_usage["game_type"] = game_type
-                        token_usage["cached_tokens"] = token_usage.get("cached_tokens", 0)
-                    
-                    # If we got highlights, break out of retry loop
-                    if highlights:
-                        if current_temperature > self.config.temperature:
-                            logger.info(f"✓ Found {len(highlights)} highlight(s) in {Path(video_path).name} with increased temperature: {current_temperature:.1f}")
-                        break
+            # Hold an analysis slot only while talking to Gemini, so this
+            # video's compilation overlaps with the next video's analysis
+            async with analysis_slots or nullcontext():
+                while retry_count <= max_retries:
+                    try:
+                        # Analyze video using specified game type with current temperature
+                        highlights, token_usage = await analyze_video(
+                            video_path=video_path,
+                            output_file=KILLS_FILE,
+                            read_existing=self._get_kills_data,
+                            write_back=self._write_kills_data,
+                            game_type=game_type,
+                            temperature=current_temperature
+                        )
                         
-                    # If no highlights and we have retries left
-                    if retry_count < max_retries:
-                        retry_count += 1
-                        # Increase temperature by 0.1 for next attempt
-                        current_temperature += 0.1
-                        logger.info(f"No highlights found in {Path(video_path).name}, retrying ({retry_count}/{max_retries}) with increased temperature: {current_temperature:.1f}")
-                        await asyncio.sleep(self.config.retry_delay_seconds)
-                    else:
-                        logger.info(f"No highlights found in {Path(video_path).name} after {max_retries} retries")
+                        # Add timestamp and game type to token usage
+                        if token_usage:
+                            token_usage["timestamp_ns"] = time.time_ns()
+                            token_usage["game_type"] = game_type
+                            token_usage["cached_tokens"] = token_usage.get("cached_tokens", 0)
                         
-                except Exception as e:
-                    logger.error(f"Error analyzing video {video_path} (attempt {retry_count + 1}): {str(e)}")
-                    if retry_count < max_retries:
-                        retry_count += 1
-                        # Also increase temperature on error retries
-                        current_temperature += 0.1
-                        logger.info(f"Retrying with increased temperature: {current_temperature:.1f}")
-                        await asyncio.sleep(self.config.retry_delay_seconds)
-                    else:
-                        raise
+                        # If we got highlights, break out of retry loop
+                        if highlights:
+                            if current_temperature > base_temperature:
+                                logger.info("✓ Found %s highlight(s) in %s with increased temperature: %.1f", len(highlights), _basename(video_path), current_temperature)
+                            break
+                            
+                        # If no highlights and we have retries left
+                        if retry_count < max_retries and await asyncio.to_thread(self._can_hold_highlight, video_path):
+                            retry_count += 1
+                            # Increase temperature by 0.1 for next attempt
+                            current_temperature += 0.1
+                            logger.info("No highlights found in %s, retrying (%s/%s) with increased temperature: %.1f", _basename(video_path), retry_count, max_retries, current_temperature)
+                            await asyncio.sleep(self._retry_delay(retry_count))
+                        else:
+                            logger.info("No highlights found in %s after %s retries", _basename(video_path), retry_count)
+                            break
+                            
+                    except Exception as e:
+                        logger.error("Error analyzing video %s (attempt %s): %s", video_path, retry_count + 1, e)
+                        if retry_count < max_retries and _is_retryable(e):
+                            retry_count += 1
+                            # Also increase temperature on error retries
+                            current_temperature += 0.1
+                            logger.info("Retrying with increased temperature: %.1f", current_temperature)
+                            await asyncio.sleep(self._retry_delay(retry_count))
+                        else:
+                            raise
             
             if not highlights:
-                logger.info(f"No kills found in {Path(video_path).name}")
-                self.processed_videos.add(video_path)
+                logger.info("No kills found in %s", _basename(video_path))
+                self._mark_processed(video_path)
                 return None, token_usage
             
-            logger.info(f"Found {len(highlights)} kill(s) in {Path(video_path).name}")
+            logger.info("Found %s kill(s) in %s", len(highlights), _basename(video_path))
             
             # Process video to create compilation
-            compilation_path = self.video_processor.process_video_highlights(video_path, highlights)
+            compilation_path = await self._compile_highlights(video_path, highlights)
             
             if compilation_path:
-                logger.info(f"✓ Created kill compilation: {Path(compilation_path).name}")
-                self.processed_videos.add(video_path)
+                logger.info("✓ Created kill compilation: %s", _basename(compilation_path))
+                self._mark_processed(video_path)
                 return compilation_path, token_usage
             else:
-                logger.error(f"Failed to create compilation for {Path(video_path).name}")
+                logger.error("Failed to create compilation for %s", _basename(video_path))
                 return None, token_usage
                 
         except Exception as e:
-            logger.error(f"Error processing video {video_path}: {str(e)}")
+            logger.error("Error processing video %s: %s", video_path, e)
             
             # Create error token data
-            error_token_data = {
-                "video": video_path,
-                "status": "error",
-                "model_name": self.config.model_name,
-                "game_type": game_type,
-                "thinking_mode": True,  # We use thinking mode
-                "prompt_tokens": 0,
-                "completion_tokens": 0,
-                "cached_tokens": 0,
-                "total_tokens": 0,
-                "cost": 0.0,
-                "timestamp": datetime.now().isoformat()
-            }
+            error_token_data = _zero_token_record(video_path, "error", self.config.model_name, game_type)
             
             return None, error_token_data
 
-    async def process_multiple_videos_with_game_types_and_tokens(self, video_game_type_pairs: List[tuple]) -> tuple[List[str], List[Dict[str, Any]]]:
+    async def process_multiple_videos_with_game_types_and_tokens(self, video_game_type_pairs: List[tuple], skip_processed: bool = True) -> tuple[List[str], List[Dict[str, Any]]]:
         """
         Process multiple videos with their respective game types concurrently and collect token data.
         
         Args:
             video_game_type_pairs: List of tuples containing (video_path, game_type)
+            skip_processed: Drop videos that were already processed or analyzed.
+                Pass False for videos the user picked explicitly.
             
         Returns:
             Tuple of (compilation paths, token usage data)
@@ -937,40 +1524,41 @@ class KillProcessor:
             logger.warning("No videos to process")
             return [], []
         
-        logger.info(f"Processing {len(video_game_type_pairs)} video(s) with custom game types")
+        if skip_processed and not self.config.reprocess_analyzed_videos:
+            pending = set(self._filter_unprocessed([video_path for video_path, _ in video_game_type_pairs]))
+            video_game_type_pairs = [pair for pair in video_game_type_pairs if pair[0] in pending]
+            if not video_game_type_pairs:
+                logger.info("All videos were already processed")
+                return [], []
+        
+        logger.info("Processing %s video(s) with custom game types", len(video_game_type_pairs))
         
-        # Process videos in batches based on config
-        batch_size = self.config.batch_size
         results = []
         token_data = []
         
-        for i in range(0, len(video_game_type_pairs), batch_size):
-            batch = video_game_type_pairs[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1} ({len(batch)} videos)")
-            
-            # Process batch concurrently
-            batch_results = await asyncio.gather(
-                *(self.process_single_video_with_game_type(video_path, game_type) 
-                  for video_path, game_type in batch),
-                return_exceptions=True
-            )
-            
-            # Filter successful results and collect token data
-            for result in batch_results:
-                if isinstance(result, tuple) and len(result) == 2:
-                    compilation_path, token_usage = result
-                    if compilation_path:  # Successful compilation
-                        results.append(compilation_path)
-                    if token_usage:  # Token data available
-                        token_data.append(token_usage)
-                elif isinstance(result, Exception):
-                    logger.error(f"Batch processing error: {str(result)}")
-        
-        logger.info(f"✓ Successfully processed {len(results)} video(s)")
+        all_results = await self._gather_limited(
+            self.process_single_video_with_game_type,
+            video_game_type_pairs
+        )
         
-        # Clean up uploaded files after batch processing
+        # Filter successful results and collect token data
+        for result in all_results:
+            if isinstance(result, tuple) and len(result) == 2:
+                compilation_path, token_usage = result
+                if compilation_path:  # Successful compilation
+                    results.append(compilation_path)
+                if token_usage:  # Token data available
+                    token_data.append(token_usage)
+            elif isinstance(result, Exception):
+                logger.error("Batch processing error: %s", result)
+        
+        logger.info("✓ Successfully processed %s video(s)", len(results))
+        
+        # Clean up uploaded files after batch processing, off the event loop.
+        # Awaited rather than run in the background: delete_all_files removes
+        # every upload, including ones the next batch may already be making
         if results:  # Only cleanup if we processed any videos
-            self.cleanup_uploaded_files()
+            await asyncio.to_thread(self.cleanup_uploaded_files)
         
         return results, token_data
 
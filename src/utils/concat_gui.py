@@ -1,20 +1,34 @@
+import os
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Tuple
 import logging
 
+from .video_processor import VideoProcessor
+
 logger = logging.getLogger(__name__)
 
+# File type filters shared by the select and add dialogs
+_VIDEO_FILETYPES = (
+    ("Video files", "*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm *.m4v"),
+    ("MP4 files", "*.mp4"),
+    ("All files", "*.*")
+)
+
 class DragDropListbox(tk.Listbox):
     """Listbox with drag and drop functionality for reordering items."""
     
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, on_move: Optional[Callable[[int, int], None]] = None, **kwargs):
         super().__init__(parent, **kwargs)
         self.bind('<Button-1>', self.on_click)
         self.bind('<B1-Motion>', self.on_drag)
         self.bind('<ButtonRelease-1>', self.on_drop)
         self.drag_start_index = None
+        # Called with (from_index, to_index) so the owner can update its list
+        # and redraw the affected rows
+        self.on_move = on_move
         
     def on_click(self, event):
         """Handle mouse click to start drag operation."""
@@ -33,16 +47,16 @@ class DragDropListbox(tk.Listbox):
         if self.drag_start_index is not None:
             drop_index = self.nearest(event.y)
             if drop_index != self.drag_start_index and 0 <= drop_index < self.size():
-                # Move the item
-                item = self.get(self.drag_start_index)
-                self.delete(self.drag_start_index)
-                self.insert(drop_index, item)
+                if self.on_move:
+                    # Let the owner update the underlying file list and rows
+                    self.on_move(self.drag_start_index, drop_index)
+                else:
+                    # Move the item
+                    item = self.get(self.drag_start_index)
+                    self.delete(self.drag_start_index)
+                    self.insert(drop_index, item)
                 self.selection_clear(0, tk.END)
                 self.selection_set(drop_index)
-                
-                # Notify parent to update the underlying file list
-                if hasattr(self.master.master.master, '_on_item_moved'):
-                    self.master.master.master._on_item_moved(self.drag_start_index, drop_index)
         self.drag_start_index = None
 
 class ConcatenationGUI:
@@ -61,6 +75,9 @@ class ConcatenationGUI:
         Returns:
             List of video file paths in the order to concatenate, or None if cancelled
         """
+        # Load FFmpeg in the background while the user picks videos
+        threading.Thread(target=VideoProcessor().warm_up, name="FFmpegWarmup", daemon=True).start()
+        
         self.root = tk.Tk()
         self.root.title("Video Concatenation")
         self.root.geometry("600x500")
@@ -121,7 +138,7 @@ class ConcatenationGUI:
         list_container.columnconfigure(0, weight=1)
         list_container.rowconfigure(0, weight=1)
         
-        self.file_listbox = DragDropListbox(list_container, height=10)
+        self.file_listbox = DragDropListbox(list_container, on_move=self._on_item_moved, height=10)
         self.file_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Scrollbar for listbox
@@ -156,20 +173,14 @@ class ConcatenationGUI:
     
     def _select_files(self):
         """Open file dialog to select initial video files."""
-        filetypes = [
-            ("Video files", "*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm *.m4v"),
-            ("MP4 files", "*.mp4"),
-            ("All files", "*.*")
-        ]
-        
         file_paths = filedialog.askopenfilenames(
             title="Select Video Files to Concatenate",
-            filetypes=filetypes,
+            filetypes=_VIDEO_FILETYPES,
             parent=self.root
         )
         
         if file_paths:
-            self.video_files = [str(Path(fp).resolve()) for fp in file_paths]
+            self.video_files = [os.path.abspath(fp) for fp in file_paths]
             self._update_file_list()
             self.status_var.set(f"Selected {len(self.video_files)} video(s)")
         else:
@@ -178,23 +189,19 @@ class ConcatenationGUI:
     
     def _add_videos(self):
         """Add more video files to the list."""
-        filetypes = [
-            ("Video files", "*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm *.m4v"),
-            ("MP4 files", "*.mp4"),
-            ("All files", "*.*")
-        ]
-        
         file_paths = filedialog.askopenfilenames(
             title="Add More Video Files",
-            filetypes=filetypes,
+            filetypes=_VIDEO_FILETYPES,
             parent=self.root
         )
         
         if file_paths:
-            new_files = [str(Path(fp).resolve()) for fp in file_paths]
-            # Avoid duplicates
+            new_files = [os.path.abspath(fp) for fp in file_paths]
+            # Avoid duplicates, checking against a set instead of scanning the list
+            known_files = set(self.video_files)
             for file_path in new_files:
-                if file_path not in self.video_files:
+                if file_path not in known_files:
+                    known_files.add(file_path)
                     self.video_files.append(file_path)
             
             self._update_file_list()
@@ -210,23 +217,71 @@ class ConcatenationGUI:
                 self._update_file_list()
                 self.status_var.set(f"Removed {Path(removed_file).name}")
     
+    def _ask_confirm(self, title: str, message: str, on_confirm: Callable[[], None]):
+        """
+        Show a Yes/No dialog that calls on_confirm if the user picks Yes.
+        
+        Unlike messagebox.askyesno this returns right away instead of running
+        a nested event loop, so the main loop keeps handling events.
+        """
+        dialog = tk.Toplevel(self.root)
+        dialog.title(title)
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        
+        def choose(confirmed: bool):
+            dialog.destroy()
+            # Give the grab back to the main window
+            self.root.grab_set()
+            if confirmed:
+                on_confirm()
+        
+        ttk.Label(dialog, text=message, padding=15, justify=tk.LEFT).pack()
+        button_frame = ttk.Frame(dialog, padding=(0, 0, 0, 10))
+        button_frame.pack()
+        yes_button = ttk.Button(button_frame, text="Yes", command=lambda: choose(True))
+        yes_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="No", command=lambda: choose(False)).pack(side=tk.LEFT, padx=5)
+        
+        dialog.protocol("WM_DELETE_WINDOW", lambda: choose(False))
+        dialog.bind("<Return>", lambda event: choose(True))
+        dialog.bind("<Escape>", lambda event: choose(False))
+        dialog.grab_set()
+        yes_button.focus_set()
+    
     def _clear_all(self):
         """Clear all videos from the list."""
         if self.video_files:
-            result = messagebox.askyesno("Clear All", 
-                                       "Are you sure you want to remove all videos?",
-                                       parent=self.root)
-            if result:
-                self.video_files.clear()
-                self._update_file_list()
-                self.status_var.set("All videos cleared")
+            self._ask_confirm("Clear All",
+                              "Are you sure you want to remove all videos?",
+                              self._clear_confirmed)
     
-    def _update_file_list(self):
-        """Update the listbox with current video files."""
-        self.file_listbox.delete(0, tk.END)
-        for i, file_path in enumerate(self.video_files):
-            filename = Path(file_path).name
-            self.file_listbox.insert(tk.END, f"{i+1}. {filename}")
+    def _clear_confirmed(self):
+        """Clear the list once the user has confirmed."""
+        self.video_files.clear()
+        self._update_file_list()
+        self.status_var.set("All videos cleared")
+    
+    def _update_file_list(self, changed_range: Optional[Tuple[int, int]] = None):
+        """
+        Update the listbox with current video files.
+        
+        Args:
+            changed_range: Inclusive (first, last) row indices to redraw, or
+                None to redraw the whole list
+        """
+        if changed_range is None:
+            first, last = 0, len(self.video_files) - 1
+            self.file_listbox.delete(0, tk.END)
+        else:
+            first, last = changed_range
+            self.file_listbox.delete(first, last)
+        if first <= last:
+            # Insert every row in one Tk call
+            self.file_listbox.insert(first, *(
+                f"{i+1}. {os.path.basename(self.video_files[i])}"
+                for i in range(first, last + 1)
+            ))
     
     def _on_item_moved(self, from_index: int, to_index: int):
         """Handle when an item is moved in the listbox."""
@@ -234,8 +289,8 @@ class ConcatenationGUI:
             # Move the file in the underlying list
             file_to_move = self.video_files.pop(from_index)
             self.video_files.insert(to_index, file_to_move)
-            # Update the display to reflect the new order
-            self._update_file_list()
+            # Only rows between the two positions change number or content
+            self._update_file_list(changed_range=(min(from_index, to_index), max(from_index, to_index)))
     
     def _get_ordered_files(self) -> List[str]:
         """Get the current order of files."""
@@ -256,11 +311,14 @@ class ConcatenationGUI:
         file_list = "\n".join([f"{i+1}. {Path(f).name}" for i, f in enumerate(ordered_files)])
         message = f"Concatenate {len(ordered_files)} videos in this order?\n\n{file_list}"
         
-        result = messagebox.askyesno("Confirm Concatenation", message, parent=self.root)
-        if result:
-            self.result = ordered_files
-            self.root.quit()
-            self.root.destroy()
+        self._ask_confirm("Confirm Concatenation", message,
+                          lambda: self._finish(ordered_files))
+    
+    def _finish(self, ordered_files: List[str]):
+        """Close the dialog, returning the files in the confirmed order."""
+        self.result = ordered_files
+        self.root.quit()
+        self.root.destroy()
     
     def _cancel(self):
         """Handle cancel button click."""
@@ -1,170 +1,143 @@
 import json
 import os
 import logging
-from typing import Dict, Any, Literal
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Dict, Any, Literal, Optional
+
+from . import json_io
 
 logger = logging.getLogger(__name__)
 
 # Define valid game types for typing
 GameType = Literal["cs2", "overwatch2", "the_finals", "league_of_legends", "custom", "kills", "splitgate2"]
 
+@dataclass(frozen=True, slots=True)
+class ConfigData:
+    """Settings resolved from config.json, with the nested sections flattened."""
+    batch_size: int = 25
+    model_name: str = "gemini-2.5-flash-preview-04-17"
+    max_retries: int = 10
+    retry_delay_seconds: int = 2
+    max_retry_delay_seconds: int = 30
+    min_highlight_duration_seconds: int = 10
+    username: str = "i have no enemies"
+    temperature: float = 1.0
+    use_caching: bool = True
+    cache_ttl_seconds: int = 3600
+    game_type: GameType = "cs2"
+    max_zero_highlight_retries: int = 3
+    make_short: bool = False
+    queue_when_gaming: bool = False
+    # folder_watcher section
+    watch_directory: str = "./videos"
+    polling_interval_seconds: int = 30
+    process_immediately: bool = True
+    reprocess_analyzed_videos: bool = False
+    # shorts section
+    shorts: Dict[str, Any] = field(default_factory=lambda: {
+        "no_webcam": False,
+        "add_subtitles": False
+    })
+    shorts_no_webcam: bool = False
+    shorts_add_subtitles: bool = False
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "ConfigData":
+        """Build settings from parsed config.json, using defaults for missing keys."""
+        values = {name: raw[name] for name in _TOP_LEVEL_FIELDS if name in raw}
+        watcher_config = raw.get("folder_watcher", {})
+        values.update((name, watcher_config[name]) for name in _WATCHER_FIELDS if name in watcher_config)
+        if "shorts" in raw:
+            shorts_config = raw["shorts"]
+            values["shorts"] = dict(shorts_config)
+            values["shorts_no_webcam"] = shorts_config.get("no_webcam", False)
+            values["shorts_add_subtitles"] = shorts_config.get("add_subtitles", False)
+        return cls(**values)
+
+# Settings read from the folder_watcher section rather than the top level
+_WATCHER_FIELDS = ("watch_directory", "polling_interval_seconds", "process_immediately", "reprocess_analyzed_videos")
+_TOP_LEVEL_FIELDS = tuple(
+    f.name for f in fields(ConfigData)
+    if f.name not in _WATCHER_FIELDS and not f.name.startswith("shorts")
+)
+
+# Used in place of config.json when it's missing; settings not listed here
+# take their ConfigData defaults
+_DEFAULT_CONFIG = MappingProxyType({
+    "use_caching": False
+})
+
+def _setting(name: str, doc: Optional[str] = None) -> property:
+    """Read-only Config property for a ConfigData field."""
+    return property(attrgetter(f"data.{name}"), doc=doc)
+
 class Config:
-    _instance = None
-    _config: Dict[str, Any] = {}
+    """Settings from config.json. Use get_config() for the shared instance."""
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(Config, cls).__new__(cls)
-            cls._instance._load_config()
-        return cls._instance
+    def __init__(self):
+        self.data: ConfigData = self._load_config()
 
-    def _load_config(self):
+    def _load_config(self) -> ConfigData:
         # Adjust path to config.json, assuming it's in the parent directory of src
         config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config.json')
         try:
-            with open(config_path, 'r') as f:
-                self._config = json.load(f)
+            raw = json_io.load_file(config_path)
             logger.info("Successfully loaded configuration from config.json")
         except FileNotFoundError:
             logger.warning("config.json not found, using default values")
-            self._config = {
-                "batch_size": 25,
-                "model_name": "gemini-2.5-flash-preview-04-17",
-                "max_retries": 10,
-                "retry_delay_seconds": 2,
-                "min_highlight_duration_seconds": 10,
-                "username": "i have no enemies",
-                "temperature": 1.0,
-                "use_caching": False,
-                "cache_ttl_seconds": 3600,
-                "game_type": "cs2",
-                "max_zero_highlight_retries": 3,
-                "make_short": False,
-                "shorts": {
-                    "no_webcam": False,
-                    "add_subtitles": False
-                },
-                "folder_watcher": {
-                    "watch_directory": "./videos",
-                    "polling_interval_seconds": 30,
-                    "process_immediately": True,
-                    "reprocess_analyzed_videos": False
-                }
-            }
+            raw = _DEFAULT_CONFIG
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing config.json: {e}")
             raise
+        return ConfigData.from_dict(raw)
+
+    # Settings read straight from ConfigData through C-level attrgetters
+    batch_size = _setting("batch_size")
+    model_name = _setting("model_name")
+    max_retries = _setting("max_retries")
+    retry_delay_seconds = _setting("retry_delay_seconds")
+    max_retry_delay_seconds = _setting("max_retry_delay_seconds")
+    min_highlight_duration_seconds = _setting("min_highlight_duration_seconds")
+    username = _setting("username")
+    temperature = _setting("temperature")
+    use_caching = _setting("use_caching")
+    cache_ttl_seconds = _setting("cache_ttl_seconds")
+    watch_directory = _setting("watch_directory", "Directory to watch for new video files")
+    polling_interval_seconds = _setting("polling_interval_seconds", "How often to check for new files in seconds")
+    process_immediately = _setting("process_immediately", "Whether to process videos immediately when detected")
+    reprocess_analyzed_videos = _setting("reprocess_analyzed_videos", "Whether to reprocess videos that have already been analyzed")
+    max_zero_highlight_retries = _setting("max_zero_highlight_retries", "Maximum number of retries when zero highlights are found")
+    make_short = _setting("make_short", "Whether to automatically create shorts from kill compilations.")
+    shorts_no_webcam = _setting("shorts_no_webcam", "Whether to create shorts without webcam overlay.")
+    shorts_add_subtitles = _setting("shorts_add_subtitles", "Whether to add subtitles to shorts.")
+    shorts = _setting("shorts", "The shorts configuration dictionary.")
+    queue_when_gaming = _setting(
+        "queue_when_gaming",
+        "Whether to queue video processing when a game is running. Queued "
+        "videos are processed in LIFO order when the game closes."
+    )
+
+    def _set_game_type(self, value: GameType):
+        """Switch the game type for this run; config.json is not changed."""
+        self.data = replace(self.data, game_type=value)
+
+    game_type = property(
+        attrgetter("data.game_type"),
+        _set_game_type,
+        doc="Game type used for prompt selection (cs2, overwatch2, the_finals, league_of_legends, custom, ...)."
+    )
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the shared Config instance, loading config.json on first use."""
+    return Config()
 
-    @property
-    def batch_size(self) -> int:
-        return self._config.get("batch_size", 25)
-
-    @property
-    def model_name(self) -> str:
-        return self._config.get("model_name", "gemini-2.5-flash-preview-04-17")
-
-    @property
-    def max_retries(self) -> int:
-        return self._config.get("max_retries", 10)
-
-    @property
-    def retry_delay_seconds(self) -> int:
-        return self._config.get("retry_delay_seconds", 2)
-
-    @property
-    def min_highlight_duration_seconds(self) -> int:
-        return self._config.get("min_highlight_duration_seconds", 10)
-
-    @property
-    def username(self) -> str:
-        return self._config.get("username", "i have no enemies")
-        
-    @property
-    def temperature(self) -> float:
-        return self._config.get("temperature", 1.0)
-
-    @property
-    def use_caching(self) -> bool:
-        return self._config.get("use_caching", True)
-
-    @property
-    def cache_ttl_seconds(self) -> int:
-        return self._config.get("cache_ttl_seconds", 3600)
-    
-    @property
-    def game_type(self) -> GameType:
-        """
-        Get the game type for prompt selection.
-        
-        Returns:
-            The game type as a string (cs2, overwatch2, the_finals, league_of_legends, custom)
-        """
-        return self._config.get("game_type", "cs2") 
-        
-    @property
-    def watch_directory(self) -> str:
-        """Directory to watch for new video files"""
-        watcher_config = self._config.get("folder_watcher", {})
-        return watcher_config.get("watch_directory", "./videos")
-        
-    @property
-    def polling_interval_seconds(self) -> int:
-        """How often to check for new files in seconds"""
-        watcher_config = self._config.get("folder_watcher", {})
-        return watcher_config.get("polling_interval_seconds", 30)
-        
-    @property
-    def process_immediately(self) -> bool:
-        """Whether to process videos immediately when detected"""
-        watcher_config = self._config.get("folder_watcher", {})
-        return watcher_config.get("process_immediately", True)
-        
-    @property
-    def reprocess_analyzed_videos(self) -> bool:
-        """Whether to reprocess videos that have already been analyzed"""
-        watcher_config = self._config.get("folder_watcher", {})
-        return watcher_config.get("reprocess_analyzed_videos", False)
-        
-    @property
-    def max_zero_highlight_retries(self) -> int:
-        """Maximum number of retries when zero highlights are found"""
-        return self._config.get("max_zero_highlight_retries", 3)
-    
-    @property
-    def make_short(self) -> bool:
-        """Whether to automatically create shorts from kill compilations."""
-        return self._config.get("make_short", False)
-    
-    @property
-    def shorts_no_webcam(self) -> bool:
-        """Whether to create shorts without webcam overlay."""
-        shorts_config = self._config.get("shorts", {})
-        return shorts_config.get("no_webcam", False)
-    
-    @property
-    def shorts_add_subtitles(self) -> bool:
-        """Whether to add subtitles to shorts."""
-        shorts_config = self._config.get("shorts", {})
-        return shorts_config.get("add_subtitles", False)
-    
-    @property
-    def shorts(self) -> Dict[str, Any]:
-        """Get the shorts configuration dictionary."""
-        return self._config.get("shorts", {
-            "no_webcam": False,
-            "add_subtitles": False
-        })
-    
-    @property
-    def queue_when_gaming(self) -> bool:
-        """
-        Whether to queue video processing when a game is running.
-        
-        When enabled, videos will be queued instead of processed immediately
-        if a game process is detected. Queued videos are processed in LIFO
-        order when the game closes.
-        
-        Returns:
-            True if videos should be queued during gaming, False otherwise
-        """
-        return self._config.get("queue_when_gaming", False) 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_api_key() -> Optional[str]:
+    """Load .env once and return GOOGLE_API_KEY, or None if it isn't set."""
+    import dotenv
+    dotenv.load_dotenv()
+    return os.getenv("GOOGLE_API_KEY")
@@ -1,6 +1,9 @@
 import os
+import time
+import random
 import logging
 import dotenv
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 from typing import Optional
 
@@ -11,28 +14,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Deletes are independent HTTPS round-trips, so overlap this many at a time
+MAX_CONCURRENT_DELETES = 16
+
+# Rate limits and server errors are retried with exponential backoff, up to
+# this many attempts per file
+MAX_DELETE_ATTEMPTS = 5
+_RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
 class FileDeleter:
     def __init__(self, api_key: str):
         """Initialize the FileDeleter with Google API credentials."""
         self.client = genai.Client(api_key=api_key)
+    
+    def _delete_file(self, name: str) -> None:
+        """Delete one file, retrying transient API errors with backoff and jitter."""
+        for attempt in range(MAX_DELETE_ATTEMPTS):
+            try:
+                self.client.files.delete(name=name)
+                return
+            except Exception as e:
+                if attempt == MAX_DELETE_ATTEMPTS - 1 or getattr(e, "code", None) not in _RETRYABLE_STATUS_CODES:
+                    raise
+                time.sleep(0.1 * (2 ** attempt) + random.uniform(0, 0.1))
+    
+    def delete_file(self, name: str) -> bool:
+        """Delete a single file from Google Files API, returning whether it succeeded."""
+        try:
+            self._delete_file(name)
+            logger.info(f"Deleted file: {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete file {name}: {str(e)}")
+            return False
         
     def delete_all_files(self) -> None:
         """Delete all files from Google Files API."""
         try:
-            # Get list of all files
-            files = list(self.client.files.list())
-            total_files = len(files)
-            logger.info(f"Found {total_files} files to delete")
+            # Read the whole listing first; deleting while paging could make
+            # later pages skip files
+            names = [file.name for file in self.client.files.list()]
+            logger.info(f"Found {len(names)} files to delete")
             
-            # Delete each file
-            for i, file in enumerate(files, 1):
-                try:
-                    self.client.files.delete(name=file.name)
-                    logger.info(f"Deleted file {i}/{total_files}: {file.name}")
-                except Exception as e:
-                    logger.error(f"Failed to delete file {file.name}: {str(e)}")
+            # Delete files concurrently; a failed delete doesn't stop the others
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DELETES) as executor:
+                deleted = sum(executor.map(self.delete_file, names))
                     
-            logger.info("File deletion process completed")
+            logger.info(f"File deletion process completed ({deleted}/{len(names)} deleted)")
             
         except Exception as e:
             logger.error(f"An error occurred while deleting files: {str(e)}")
@@ -2,21 +2,55 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
 from typing import List, Optional, Dict, Tuple
+import os
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# File type filters for the video selection dialog
+_VIDEO_FILETYPES = (
+    ("Video files", "*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm *.m4v"),
+    ("MP4 files", "*.mp4"),
+    ("AVI files", "*.avi"),
+    ("MOV files", "*.mov"),
+    ("MKV files", "*.mkv"),
+    ("All files", "*.*")
+)
+
+# Available prompt types, as (code, display name)
+_PROMPT_TYPES = (
+    ("cs2", "Counter-Strike 2"),
+    ("overwatch2", "Overwatch 2"),
+    ("the_finals", "The Finals"),
+    ("league_of_legends", "League of Legends"),
+    ("splitgate2", "Splitgate 2"),
+    ("kills", "Kill Feed Detection"),
+    ("custom", "Custom/General")
+)
+# Combobox labels shared by the global and every per-video selection
+_PROMPT_TYPE_LABELS = tuple(f"{code} - {name}" for code, name in _PROMPT_TYPES)
+
+# Hidden tkinter root shared by every FileSelector in the process
+_root: Optional[tk.Tk] = None
+_root_lock = threading.Lock()
+
+def _get_root() -> tk.Tk:
+    """Return the shared hidden root window, creating it the first time a dialog needs it."""
+    global _root
+    with _root_lock:
+        if _root is None:
+            _root = tk.Tk()
+            _root.withdraw()  # Hide the main window
+        return _root
+
 class FileSelector:
     """Cross-platform file selector using tkinter."""
     
-    def __init__(self):
-        self.root = None
-    
-    def _init_tk(self):
-        """Initialize tkinter root window (hidden)."""
-        if self.root is None:
-            self.root = tk.Tk()
-            self.root.withdraw()  # Hide the main window
+    @property
+    def root(self) -> tk.Tk:
+        """Hidden tkinter root window shared by all selectors."""
+        return _root if _root is not None else _get_root()
     
     def select_video_files(self, title: str = "Select Video Files") -> List[str]:
         """
@@ -29,26 +63,17 @@ class FileSelector:
             List of selected file paths
         """
         try:
-            self._init_tk()
-            
-            # Define video file types
-            filetypes = [
-                ("Video files", "*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm *.m4v"),
-                ("MP4 files", "*.mp4"),
-                ("AVI files", "*.avi"),
-                ("MOV files", "*.mov"),
-                ("MKV files", "*.mkv"),
-                ("All files", "*.*")
-            ]
-            
             file_paths = filedialog.askopenfilenames(
                 title=title,
-                filetypes=filetypes,
-                multiple=True
+                filetypes=_VIDEO_FILETYPES,
+                multiple=True,
+                parent=self.root
             )
             
-            # Convert to list and filter out empty strings
-            selected_files = [str(Path(fp).resolve()) for fp in file_paths if fp]
+            # Convert to list and filter out empty strings. The dialog already
+            # returns absolute paths, so only normalize them; resolving
+            # symlinks would stat every path component
+            selected_files = [os.path.abspath(fp) for fp in file_paths if fp]
             
             logger.info(f"Selected {len(selected_files)} video file(s)")
             return selected_files
@@ -68,19 +93,6 @@ class FileSelector:
             Dictionary mapping video file paths to selected prompt types
         """
         try:
-            self._init_tk()
-            
-            # Available prompt types
-            prompt_types = [
-                ("cs2", "Counter-Strike 2"),
-                ("overwatch2", "Overwatch 2"),
-                ("the_finals", "The Finals"),
-                ("league_of_legends", "League of Legends"),
-                ("splitgate2", "Splitgate 2"),
-                ("kills", "Kill Feed Detection"),
-                ("custom", "Custom/General")
-            ]
-            
             # Create dialog window
             dialog = tk.Toplevel(self.root)
             dialog.title("Select Prompt Types")
@@ -119,10 +131,10 @@ class FileSelector:
             
             ttk.Label(global_prompt_frame, text="Prompt type:").pack(side=tk.LEFT)
             global_prompt_combo = ttk.Combobox(global_prompt_frame, textvariable=global_prompt_var, 
-                                             values=[f"{code} - {name}" for code, name in prompt_types],
+                                             values=_PROMPT_TYPE_LABELS,
                                              state="readonly", width=30)
             global_prompt_combo.pack(side=tk.LEFT, padx=(5, 0))
-            global_prompt_combo.set("cs2 - Counter-Strike 2")
+            global_prompt_combo.set(_PROMPT_TYPE_LABELS[0])
             
             # Individual video selections frame
             videos_frame = ttk.LabelFrame(main_frame, text="Individual Video Settings", padding=10)
@@ -144,8 +156,9 @@ class FileSelector:
             canvas.pack(side="left", fill="both", expand=True)
             scrollbar.pack(side="right", fill="y")
             
-            # Store individual prompt variables
+            # Store individual prompt variables and their comboboxes
             individual_prompt_vars = {}
+            combo_widgets: List[ttk.Combobox] = []
             
             # Create selection for each video
             for i, video_path in enumerate(video_files):
@@ -164,18 +177,17 @@ class FileSelector:
                 individual_prompt_vars[video_path] = prompt_var
                 
                 prompt_combo = ttk.Combobox(video_frame, textvariable=prompt_var,
-                                          values=[f"{code} - {name}" for code, name in prompt_types],
+                                          values=_PROMPT_TYPE_LABELS,
                                           state="readonly", width=40)
                 prompt_combo.pack(anchor=tk.W, padx=(10, 0))
-                prompt_combo.set("cs2 - Counter-Strike 2")
+                prompt_combo.set(_PROMPT_TYPE_LABELS[0])
+                combo_widgets.append(prompt_combo)
             
             # Function to toggle individual controls based on apply_all checkbox
             def toggle_individual_controls():
                 state = "disabled" if apply_all_var.get() else "readonly"
-                for child in scrollable_frame.winfo_children():
-                    for widget in child.winfo_children():
-                        if isinstance(widget, ttk.Combobox):
-                            widget.configure(state=state)
+                for widget in combo_widgets:
+                    widget.configure(state=state)
             
             apply_all_var.trace("w", lambda *args: toggle_individual_controls())
             
@@ -231,8 +243,6 @@ class FileSelector:
             True if user confirms re-analysis, False otherwise
         """
         try:
-            self._init_tk()
-            
             video_name = Path(video_path).name
             message = (
                 f"The video '{video_name}' has already been analyzed.\n\n"
@@ -242,7 +252,8 @@ class FileSelector:
             result = messagebox.askyesno(
                 "Re-analyze Video?",
                 message,
-                icon="question"
+                icon="question",
+                parent=self.root
             )
             
             logger.info(f"Re-analysis confirmation for {video_name}: {result}")
@@ -260,8 +271,6 @@ class FileSelector:
             True if user wants to continue processing, False otherwise
         """
         try:
-            self._init_tk()
-            
             message = (
                 "Would you like to process more videos?\n\n"
                 "Click 'Yes' to select and process another batch of videos.\n"
@@ -271,7 +280,8 @@ class FileSelector:
             result = messagebox.askyesno(
                 "Process More Videos?",
                 message,
-                icon="question"
+                icon="question",
+                parent=self.root
             )
             
             logger.info(f"Continue processing confirmation: {result}")
@@ -284,24 +294,25 @@ class FileSelector:
     def show_info(self, title: str, message: str):
         """Show information dialog."""
         try:
-            self._init_tk()
-            messagebox.showinfo(title, message)
+            messagebox.showinfo(title, message, parent=self.root)
         except Exception as e:
             logger.error(f"Error showing info dialog: {str(e)}")
     
     def show_error(self, title: str, message: str):
         """Show error dialog."""
         try:
-            self._init_tk()
-            messagebox.showerror(title, message)
+            messagebox.showerror(title, message, parent=self.root)
         except Exception as e:
             logger.error(f"Error showing error dialog: {str(e)}")
     
     def cleanup(self):
         """Clean up tkinter resources."""
-        if self.root:
+        global _root
+        # Forget the shared root so a later dialog creates a new one
+        with _root_lock:
+            root, _root = _root, None
+        if root:
             try:
-                self.root.destroy()
-                self.root = None
+                root.destroy()
             except Exception as e:
                 logger.error(f"Error cleaning up tkinter: {str(e)}") 
\ No newline at end of file
@@ -1,36 +1,55 @@
 import os
 import time
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Set, Callable, Optional
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileCreatedEvent, FileModifiedEvent
+from watchdog.observers.polling import PollingObserver
+from watchdog.events import FileSystemEventHandler, FileCreatedEvent, FileModifiedEvent, FileDeletedEvent
+from .video_files import iter_video_files
 
 logger = logging.getLogger(__name__)
 
+# Extensions treated as video files by the watcher
+WATCHED_VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv')
+
+# Handled file signatures kept for skipping late events; the oldest are
+# forgotten beyond this so long watch sessions don't grow without bound
+MAX_HANDLED_SIGNATURES = 1024
+
 class VideoFileHandler(FileSystemEventHandler):
     """Handler for video file events."""
     
     def __init__(self, 
                  process_callback: Callable[[str], None],
-                 supported_extensions: tuple = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv'),
+                 supported_extensions: tuple = WATCHED_VIDEO_EXTENSIONS,
                  ignore_existing_files: Set[str] = None):
         super().__init__()
         self.process_callback = process_callback
         self.supported_extensions = supported_extensions
+        # Lowercased once so each event is a single set lookup
+        self._extension_set = frozenset(ext.lower() for ext in supported_extensions)
         self.processing_files: Set[str] = set()
         self.pending_files: Set[str] = set()  # Files waiting for stability
         self.ignored_files: Set[str] = ignore_existing_files or set()  # Files to ignore
-        self.last_modified: dict = {}
+        self.last_modified: dict = {}  # (mtime_ns, size) last seen per pending file
+        # (mtime_ns, size) of each file when it was handed to the callback, so
+        # late events for an unchanged file don't process it again
+        self.handled_signatures: OrderedDict = OrderedDict()
         
     def is_video_file(self, file_path: str) -> bool:
         """Check if file is a supported video format."""
-        return Path(file_path).suffix.lower() in self.supported_extensions
+        return os.path.splitext(file_path)[1].lower() in self._extension_set
     
     def is_file_stable(self, file_path: str, stability_window: int = 2) -> bool:
         """
         Check if file has stopped being modified (file is stable).
         
+        A file is stable once its mtime and size are unchanged since the
+        previous check and it hasn't been written for stability_window.
+        
         Args:
             file_path: Path to the file
             stability_window: Seconds to wait for file stability
@@ -39,23 +58,23 @@ class VideoFileHandler(FileSystemEventHandler):
             True if file is stable, False otherwise
         """
         try:
-            current_mtime = os.path.getmtime(file_path)
-            last_mtime = self.last_modified.get(file_path, 0)
+            stat = os.stat(file_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
             
-            # If this is the first time we see this file, record the time and wait
+            # If this is the first time we see this file, record it and wait
             if file_path not in self.last_modified:
-                self.last_modified[file_path] = current_mtime
+                self.last_modified[file_path] = signature
                 logger.debug(f"First time seeing file: {file_path}, waiting for stability")
                 return False
             
-            # If file has been modified since last check, update timestamp and wait
-            if current_mtime != last_mtime:
-                self.last_modified[file_path] = current_mtime
+            # If file has been written since last check, update signature and wait
+            if signature != self.last_modified[file_path]:
+                self.last_modified[file_path] = signature
                 logger.debug(f"File modified: {file_path}, waiting for stability")
                 return False
                 
             # Check if enough time has passed since last modification
-            time_since_modification = time.time() - current_mtime
+            time_since_modification = time.time() - stat.st_mtime
             is_stable = time_since_modification >= stability_window
             
             if is_stable:
@@ -83,6 +102,12 @@ class VideoFileHandler(FileSystemEventHandler):
             logger.debug(f"File modified event: {event.src_path}")
             self._handle_video_file(event.src_path)
     
+    def on_deleted(self, event):
+        """Forget tracking state for deleted files."""
+        if isinstance(event, FileDeletedEvent) and not event.is_directory:
+            self.handled_signatures.pop(event.src_path, None)
+            self.last_modified.pop(event.src_path, None)
+    
     def _handle_video_file(self, file_path: str):
         """Process a video file if it meets criteria."""
         logger.debug(f"Handling file: {file_path}")
@@ -108,25 +133,44 @@ class VideoFileHandler(FileSystemEventHandler):
             logger.debug(f"File already pending stability check: {file_path}")
             return
         
+        # Skip late events for a file that hasn't changed since it was handled
+        handled = self.handled_signatures.get(file_path)
+        if handled is not None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return
+            if (stat.st_mtime_ns, stat.st_size) == handled:
+                logger.debug(f"File unchanged since it was processed: {file_path}")
+                return
+        
         # Check if file is stable before processing
         if not self.is_file_stable(file_path):
             logger.debug(f"File not stable yet: {file_path}")
             # Add to pending set to prevent duplicate stability checks
             self.pending_files.add(file_path)
             
-            # Schedule a retry after a short delay
-            import threading
+            # Schedule a retry after a short delay, a bit longer than the stability window
             def retry_after_delay():
-                time.sleep(3)  # Wait a bit longer than stability window
                 # Remove from pending before retry
                 self.pending_files.discard(file_path)
                 self._handle_video_file(file_path)
             
-            threading.Thread(target=retry_after_delay, daemon=True).start()
+            timer = threading.Timer(3, retry_after_delay)
+            timer.daemon = True
+            timer.start()
             return
         
         # File is stable, proceed with processing
         self.processing_files.add(file_path)
+        try:
+            stat = os.stat(file_path)
+            self.handled_signatures[file_path] = (stat.st_mtime_ns, stat.st_size)
+            self.handled_signatures.move_to_end(file_path)
+            while len(self.handled_signatures) > MAX_HANDLED_SIGNATURES:
+                self.handled_signatures.popitem(last=False)
+        except OSError:
+            pass
         
         try:
             logger.info(f"New video detected: {Path(file_path).name}")
@@ -164,14 +208,7 @@ class FileWatcher:
         logger.info(f"Starting file watcher on: {self.watch_directory}")
         
         # Get existing video files to ignore
-        video_extensions = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv')
-        existing_files = set()
-        
-        for ext in video_extensions:
-            for video_path in self.watch_directory.rglob(f"*{ext}"):
-                existing_files.add(str(video_path))
-            for video_path in self.watch_directory.rglob(f"*{ext.upper()}"):
-                existing_files.add(str(video_path))
+        existing_files = set(iter_video_files(str(self.watch_directory), WATCHED_VIDEO_EXTENSIONS))
         
         if existing_files:
             logger.debug(f"Ignoring {len(existing_files)} existing files")
@@ -179,10 +216,23 @@ class FileWatcher:
         # Create event handler with existing files to ignore
         event_handler = VideoFileHandler(self.process_callback, ignore_existing_files=existing_files)
         
-        # Create and start observer
-        self.observer = Observer()
-        self.observer.schedule(event_handler, str(self.watch_directory), recursive=True)
-        self.observer.start()
+        # Create and start observer, using the platform's native file events
+        # (inotify, ReadDirectoryChangesW, FSEvents) when available
+        observer = Observer()
+        try:
+            observer.schedule(event_handler, str(self.watch_directory), recursive=True)
+            observer.start()
+            self.observer = observer
+        except OSError as e:
+            # e.g. inotify watch limit reached or a network share without change events
+            logger.warning(f"Native file events unavailable ({e}), falling back to polling every {self.polling_interval}s")
+            # Release the failed observer's watches and thread before replacing it
+            observer.stop()
+            if observer.is_alive():
+                observer.join()
+            self.observer = PollingObserver(timeout=self.polling_interval)
+            self.observer.schedule(event_handler, str(self.watch_directory), recursive=True)
+            self.observer.start()
         self.is_watching = True
         
         logger.info("✓ File watcher started successfully")
@@ -214,18 +264,13 @@ class FileWatcher:
         """Process any existing video files in the watch directory."""
         logger.info(f"Scanning for existing videos in: {self.watch_directory}")
         
-        video_extensions = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv')
-        existing_videos = []
-        
-        for ext in video_extensions:
-            existing_videos.extend(self.watch_directory.rglob(f"*{ext}"))
-            existing_videos.extend(self.watch_directory.rglob(f"*{ext.upper()}"))
+        existing_videos = list(iter_video_files(str(self.watch_directory), WATCHED_VIDEO_EXTENSIONS))
         
         if existing_videos:
             logger.info(f"Found {len(existing_videos)} existing video(s)")
             for video_path in existing_videos:
                 try:
-                    self.process_callback(str(video_path))
+                    self.process_callback(video_path)
                 except Exception as e:
                     logger.error(f"Error processing existing video {video_path}: {str(e)}")
         else:
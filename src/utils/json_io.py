@@ -0,0 +1,47 @@
+import json
+import os
+from typing import Any
+
+# orjson is optional; fall back to the standard library when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(data: bytes) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to JSON bytes indented with two spaces."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+def load_file(path: str) -> Any:
+    """
+    Read and parse a JSON file.
+    
+    The file is opened unbuffered and read in one call sized from its
+    stat, then parsed from that single bytes object.
+    """
+    with open(path, 'rb', buffering=0) as f:
+        return loads(f.readall())
+
+def dump_file(path: str, obj: Any):
+    """
+    Write obj to a JSON file indented with two spaces.
+    
+    The data is written to a temporary file next to path in a single
+    buffered write, flushed to disk and then moved over path, so readers
+    never see a partially written file.
+    """
+    data = dumps(obj)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb', buffering=1 << 20) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -25,6 +25,10 @@ class GameProcessMonitor:
         'portalwars2client-win64-shipping.exe': 'splitgate2',  # Splitgate 2
     }
     
+    # Lowercase process name -> GAME_PROCESS_MAP key, so each running
+    # process is matched with one dictionary lookup
+    _PROCESS_LOOKUP = {game_process.lower(): game_process for game_process in GAME_PROCESS_MAP}
+    
     def __init__(self, config: Config, check_interval: float = 5.0, 
                  on_game_start=None, on_game_stop=None):
         """
@@ -58,15 +62,12 @@ class GameProcessMonitor:
         running_games = {}
         
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
+            for proc in psutil.process_iter(['name']):
                 try:
-                    proc_name = proc.info['name'].lower()
-                    
                     # Check if this process matches any of our monitored games
-                    for game_process, game_type in self.GAME_PROCESS_MAP.items():
-                        if proc_name == game_process.lower():
-                            running_games[game_process] = game_type
-                            break
+                    game_process = self._PROCESS_LOOKUP.get((proc.info['name'] or '').lower())
+                    if game_process:
+                        running_games[game_process] = self.GAME_PROCESS_MAP[game_process]
                             
                 except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                     # Process might have ended or we don't have access
@@ -77,14 +78,19 @@ class GameProcessMonitor:
             
         return running_games
     
-    def detect_active_game(self) -> Optional[str]:
+    def detect_active_game(self, running_games: Optional[Dict[str, str]] = None) -> Optional[str]:
         """
         Detect the currently active game and return its game type.
         
+        Args:
+            running_games: Result of get_running_game_processes, scanned
+                here if not provided
+        
         Returns:
             Game type string if a game is detected, None otherwise
         """
-        running_games = self.get_running_game_processes()
+        if running_games is None:
+            running_games = self.get_running_game_processes()
         
         if not running_games:
             return None
@@ -111,7 +117,7 @@ class GameProcessMonitor:
             
         # Update the config's internal game type
         # Note: This is a runtime change, not persisted to config.json
-        self.config._config['game_type'] = new_game_type
+        self.config.game_type = new_game_type
         self.current_game_type = new_game_type
         
         logger.info(f"🎮 Game detected: Switched to '{new_game_type}' configuration")
@@ -123,8 +129,9 @@ class GameProcessMonitor:
         
         while not self.stop_event.wait(self.check_interval):
             try:
-                detected_game_type = self.detect_active_game()
+                # One process scan per tick serves both detection and logging
                 running_games = self.get_running_game_processes()
+                detected_game_type = self.detect_active_game(running_games)
                 
                 # Update detected processes for logging
                 current_processes = set(running_games.keys())
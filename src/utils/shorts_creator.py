@@ -6,7 +6,7 @@ import logging
 import datetime
 import glob
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from .subtitle_generator import SubtitleGenerator
 
 logger = logging.getLogger(__name__)
@@ -35,7 +35,7 @@ class ShortsCreator:
         except Exception as e:
             logger.warning(f"Error cleaning up subtitle JSON files: {e}")
     
-    def create_short_from_compilation(self, video_path: str, no_webcam: bool = False, add_subtitles: bool = False) -> Optional[str]:
+    def create_short_from_compilation(self, video_path: str, no_webcam: bool = False, add_subtitles: bool = False, dimensions: Optional[Tuple[int, int]] = None) -> Optional[str]:
         """
         Create a shorts-style video from a kill compilation.
         
@@ -43,6 +43,7 @@ class ShortsCreator:
             video_path: Path to the compilation video
             no_webcam: If True, create video without webcam overlay
             add_subtitles: If True, add subtitles to the video
+            dimensions: Known (width, height) of the video; probed with ffprobe if not given
             
         Returns:
             Path to created short video or None if failed
@@ -63,16 +64,15 @@ class ShortsCreator:
         
         with tempfile.TemporaryDirectory() as temp_dir:
             try:
-                # Get source video dimensions
-                src_width = int(subprocess.check_output([
-                    "ffprobe", "-v", "error", "-select_streams", "v:0",
-                    "-show_entries", "stream=width", "-of", "csv=p=0", video_path
-                ]).decode().strip())
-                
-                src_height = int(subprocess.check_output([
-                    "ffprobe", "-v", "error", "-select_streams", "v:0",
-                    "-show_entries", "stream=height", "-of", "csv=p=0", video_path
-                ]).decode().strip())
+                if dimensions:
+                    src_width, src_height = dimensions
+                else:
+                    # Get source video dimensions with a single probe
+                    output = subprocess.check_output([
+                        "ffprobe", "-v", "error", "-select_streams", "v:0",
+                        "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x", video_path
+                    ]).decode().strip()
+                    src_width, src_height = (int(value) for value in output.split("x")[:2])
                 
                 logger.info(f"Source video dimensions: {src_width}x{src_height}")
             except Exception as e:
@@ -8,6 +8,9 @@ import subprocess
 
 logger = logging.getLogger(__name__)
 
+# Bundled fonts directory at the project root
+_FONTS_DIR = Path(__file__).parent.parent.parent / "fonts"
+
 class SubtitleGenerator:
     """Generates subtitles with word-level timestamps using NVIDIA Parakeet TDT 0.6B V2."""
     
@@ -315,7 +318,7 @@ class SubtitleGenerator:
                 logger.info(f"Escaped ASS path: {escaped_ass_path}")
                 
                 # Get font directory path for FFmpeg
-                fonts_dir = Path(__file__).parent.parent.parent / "fonts"
+                fonts_dir = _FONTS_DIR
                 escaped_fonts_dir = self._escape_path_for_ffmpeg_filter(str(fonts_dir))
                 
                 # Try GPU encoding with subtitle filter (CPU decode -> subtitle filter -> GPU encode)
@@ -401,7 +404,7 @@ class SubtitleGenerator:
             temp_ass = tempfile.NamedTemporaryFile(mode='w', suffix='.ass', delete=False, encoding='utf-8')
             
             # Get absolute path to fonts directory
-            fonts_dir = Path(__file__).parent.parent.parent / "fonts"
+            fonts_dir = _FONTS_DIR
             coolvetica_font = fonts_dir / "Coolvetica Rg.otf"
             
             # ASS file header with Coolvetica font, smaller size, thicker outline, and higher position
@@ -456,7 +459,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             logger.debug(f"CPU fallback - Escaped ASS path: {escaped_ass_path}")
             
             # Get font directory path for FFmpeg
-            fonts_dir = Path(__file__).parent.parent.parent / "fonts"
+            fonts_dir = _FONTS_DIR
             escaped_fonts_dir = self._escape_path_for_ffmpeg_filter(str(fonts_dir))
             
             cmd = [
@@ -1,3 +1,5 @@
+import os
+import math
 import logging
 import csv
 from typing import Dict, Any, List
@@ -143,29 +145,7 @@ def export_token_data_to_csv(token_data: List[Dict[str, Any]], mode: str, start_
             writer.writeheader()
             
             # Write individual video data (if any)
-            for data in token_data:
-                # Extract video name from path
-                video_path = data.get("video", "")
-                video_name = Path(video_path).name if video_path and video_path != "TOTAL" else video_path
-                
-                # Determine if thinking mode was used based on model
-                thinking_mode = data.get("thinking_mode", True if "gemini-2.5-flash-preview" in data.get("model_name", "").lower() else False)
-                
-                row = {
-                    "timestamp": data.get("timestamp", datetime.now().isoformat()),
-                    "video_path": video_path,
-                    "video_name": video_name,
-                    "status": data.get("status", "unknown"),
-                    "model_name": data.get("model_name", ""),
-                    "game_type": data.get("game_type", ""),
-                    "thinking_mode": thinking_mode,
-                    "prompt_tokens": data.get("prompt_tokens", 0),
-                    "completion_tokens": data.get("completion_tokens", 0),
-                    "cached_tokens": data.get("cached_tokens", 0),
-                    "total_tokens": data.get("total_tokens", 0),
-                    "cost_usd": data.get("cost", 0.0)
-                }
-                writer.writerow(row)
+            writer.writerows(_token_csv_row(data) for data in token_data)
         
         if token_data:
             logger.info(f"✓ Token usage data exported to {csv_path}")
@@ -177,6 +157,41 @@ def export_token_data_to_csv(token_data: List[Dict[str, Any]], mode: str, start_
         logger.error(f"Failed to export token data to CSV: {str(e)}")
         raise
 
+def _format_timestamp(token_data: Dict[str, Any]) -> str:
+    """
+    ISO timestamp for a token usage record.
+    
+    Records carry a raw time.time_ns() value that is only formatted here,
+    when the record is written; an explicit timestamp string wins.
+    """
+    if "timestamp" in token_data:
+        return token_data["timestamp"]
+    timestamp_ns = token_data.get("timestamp_ns")
+    if timestamp_ns is None:
+        return datetime.now().isoformat()
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+def _token_csv_row(token_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a CSV row from a single token usage record."""
+    # Extract video name from path
+    video_path = token_data.get("video", "")
+    video_name = os.path.basename(video_path) if video_path and video_path != "TOTAL" else video_path
+    
+    return {
+        "timestamp": _format_timestamp(token_data),
+        "video_path": video_path,
+        "video_name": video_name,
+        "status": token_data.get("status", "unknown"),
+        "model_name": token_data.get("model_name", ""),
+        "game_type": token_data.get("game_type", ""),
+        "thinking_mode": token_data.get("thinking_mode", True if "gemini-2.5-flash-preview" in token_data.get("model_name", "").lower() else False),
+        "prompt_tokens": token_data.get("prompt_tokens", 0),
+        "completion_tokens": token_data.get("completion_tokens", 0),
+        "cached_tokens": token_data.get("cached_tokens", 0),
+        "total_tokens": token_data.get("total_tokens", 0),
+        "cost_usd": token_data.get("cost", 0.0)
+    }
+
 def append_token_data_to_csv(token_data: Dict[str, Any], csv_path: str) -> None:
     """
     Append a single token usage record to existing CSV file.
@@ -185,34 +200,21 @@ def append_token_data_to_csv(token_data: Dict[str, Any], csv_path: str) -> None:
         token_data: Token usage dictionary for a single video
         csv_path: Path to the existing CSV file
     """
+    append_token_rows_to_csv([token_data], csv_path)
+
+def append_token_rows_to_csv(token_data: List[Dict[str, Any]], csv_path: str) -> None:
+    """
+    Append several token usage records to existing CSV file in one write.
+    
+    Args:
+        token_data: Token usage dictionaries, one per video
+        csv_path: Path to the existing CSV file
+    """
+    if not token_data:
+        return
+    
     try:
-        # Check if file exists
-        if not Path(csv_path).exists():
-            logger.warning(f"CSV file {csv_path} does not exist, creating new file")
-            export_token_data_to_csv([token_data], "watch")
-            return
-        
-        # Extract video name from path
-        video_path = token_data.get("video", "")
-        video_name = Path(video_path).name if video_path else ""
-        
-        # Prepare row data
-        row = {
-            "timestamp": token_data.get("timestamp", datetime.now().isoformat()),
-            "video_path": video_path,
-            "video_name": video_name,
-            "status": token_data.get("status", "unknown"),
-            "model_name": token_data.get("model_name", ""),
-            "game_type": token_data.get("game_type", ""),
-            "thinking_mode": token_data.get("thinking_mode", True if "gemini-2.5-flash-preview" in token_data.get("model_name", "").lower() else False),
-            "prompt_tokens": token_data.get("prompt_tokens", 0),
-            "completion_tokens": token_data.get("completion_tokens", 0),
-            "cached_tokens": token_data.get("cached_tokens", 0),
-            "total_tokens": token_data.get("total_tokens", 0),
-            "cost_usd": token_data.get("cost", 0.0)
-        }
-        
-        # Append to existing file
+        # Append to the file, creating it if needed
         with open(csv_path, 'a', newline='', encoding='utf-8') as csvfile:
             fieldnames = [
                 "timestamp", "video_path", "video_name", "status", "model_name", 
@@ -220,14 +222,22 @@ def append_token_data_to_csv(token_data: Dict[str, Any], csv_path: str) -> None:
                 "total_tokens", "cost_usd"
             ]
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writerow(row)
+            # A new or empty file needs the header first
+            if csvfile.tell() == 0:
+                logger.warning(f"CSV file {csv_path} did not exist, created new file")
+                writer.writeheader()
+            writer.writerows(_token_csv_row(data) for data in token_data)
         
-        logger.debug(f"✓ Appended token data for {video_name} to {csv_path}")
+        logger.debug(f"✓ Appended {len(token_data)} token record(s) to {csv_path}")
         
     except Exception as e:
         logger.error(f"Failed to append token data to CSV: {str(e)}")
         raise
 
+def total_token_cost(token_data: List[Dict[str, Any]]) -> float:
+    """Sum the cost of token usage records."""
+    return math.fsum([data.get("cost", 0.0) for data in token_data])
+
 def log_token_summary(token_data: List[Dict[str, Any]]) -> None:
     """
     Log a summary of token usage and costs.
@@ -246,16 +256,20 @@ def log_token_summary(token_data: List[Dict[str, Any]]) -> None:
         logger.info("No video token data to summarize")
         return
     
-    # Calculate totals
-    total_prompt_tokens = sum(data.get("prompt_tokens", 0) for data in video_data)
-    total_completion_tokens = sum(data.get("completion_tokens", 0) for data in video_data)
-    total_cached_tokens = sum(data.get("cached_tokens", 0) for data in video_data)
+    # Calculate totals and count successful vs failed videos in one pass
+    total_prompt_tokens = total_completion_tokens = total_cached_tokens = 0
+    successful_videos = failed_videos = 0
+    for data in video_data:
+        total_prompt_tokens += data.get("prompt_tokens", 0)
+        total_completion_tokens += data.get("completion_tokens", 0)
+        total_cached_tokens += data.get("cached_tokens", 0)
+        status = data.get("status")
+        if status == "success":
+            successful_videos += 1
+        elif status in ("error", "failed"):
+            failed_videos += 1
     total_tokens = total_prompt_tokens + total_completion_tokens
-    total_cost = sum(data.get("cost", 0.0) for data in video_data)
-    
-    # Count successful vs failed videos
-    successful_videos = len([data for data in video_data if data.get("status") == "success"])
-    failed_videos = len([data for data in video_data if data.get("status") in ["error", "failed"]])
+    total_cost = total_token_cost(video_data)
     
     # Log summary
     logger.info("=" * 50)
@@ -3,25 +3,61 @@ import json
 import logging
 import asyncio
 import csv
-from typing import List, Dict, Any, Tuple, Optional
-import dotenv
+import threading
+from typing import List, Dict, Any, Tuple, Optional, Callable
 from google import genai
 from google.genai import types
 from google.genai.types import GenerateContentConfig
 from pathlib import Path
-from functools import partial
+from functools import partial, lru_cache
 from datetime import datetime
 from utils.delete_files import FileDeleter
-from utils.config import Config
+from utils import json_io
+from utils.config import Config, get_config, get_api_key
 from utils.prompts import get_prompt
 from utils.token_counter import get_model_pricing, calculate_cost
 
 # Get module-specific logger
 logger = logging.getLogger(__name__)
 
+class MissingAPIKeyError(ValueError):
+    """Raised when GOOGLE_API_KEY is not configured."""
+
+class UnsupportedVideoFormatError(ValueError):
+    """Raised for videos that aren't in a format Gemini accepts."""
+
 # Stores the current prompt cache reference
 _prompt_cache = None
 
+# Uploaded Files API handles keyed by (path, mtime_ns, size), so retries of
+# an unchanged video reuse its upload instead of sending the file again
+_uploaded_files: Dict[Tuple[str, int, int], Any] = {}
+_uploaded_files_lock = threading.Lock()
+
+def _upload_key(video_path: str) -> Tuple[str, int, int]:
+    """Identify a video file's current contents without reading it."""
+    st = os.stat(video_path)
+    return (os.path.normcase(os.path.realpath(video_path)), st.st_mtime_ns, st.st_size)
+
+def pop_uploaded_file(video_path: str) -> Optional[Any]:
+    """Remove and return the cached upload handle for video_path, if any."""
+    try:
+        upload_key = _upload_key(video_path)
+    except OSError:
+        return None
+    with _uploaded_files_lock:
+        return _uploaded_files.pop(upload_key, None)
+
+def forget_uploaded_files():
+    """Drop cached upload handles; call when the uploaded files are deleted."""
+    with _uploaded_files_lock:
+        _uploaded_files.clear()
+
+@lru_cache(maxsize=1)
+def _get_client(api_key: str) -> genai.Client:
+    """Return a Gemini client for api_key, shared so its HTTP connections are reused across videos."""
+    return genai.Client(api_key=api_key, http_options=types.HttpOptions(api_version="v1beta"))
+
 async def get_or_create_prompt_cache(client, config: Config) -> Optional[str]:
     """Get or create a cache for the prompt template."""
     global _prompt_cache
@@ -63,76 +99,86 @@ async def get_or_create_prompt_cache(client, config: Config) -> Optional[str]:
         logger.error(f"Failed to create prompt cache: {str(e)}")
         return None
 
-async def analyze_videos_batch(video_paths: List[str], output_file: str = "exported_metadata/highlights.json", batch_size: int = 10, prompt_template=None, token_cost_file: str = "exported_metadata/token_costs.csv") -> List[Tuple[str, List[Dict[str, Any]]]]:
+async def analyze_videos_batch(video_paths: List[str], output_file: str = "exported_metadata/highlights.json", batch_size: int = 10, prompt_template=None, token_cost_file: str = "exported_metadata/token_costs.csv", append_token_costs: bool = False) -> List[Tuple[str, List[Dict[str, Any]]]]:
     """
-    Analyze multiple videos in batches using Gemini.
+    Analyze multiple videos concurrently using Gemini.
 
     Args:
         video_paths: List of paths to video files
         output_file: Path to the JSON file where highlights will be saved
         batch_size: Number of videos to process concurrently
         prompt_template: Template string for the analysis prompt
+        append_token_costs: Append to token_cost_file instead of overwriting it
 
     Returns:
         List of tuples containing (video_path, highlights)
     """
-    config = Config()
+    config = get_config()
     batch_size = batch_size or config.batch_size
 
     results = []
     token_usage = []  # Track token usage for each video
 
     # Get API key once for both analysis and cleanup
-    dotenv.load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
+    api_key = get_api_key()
     if not api_key:
-        raise ValueError("GOOGLE_API_KEY not found in environment variables")
-
-    try:
-        # Process videos in batches
-        for i in range(0, len(video_paths), batch_size):
-            batch = video_paths[i:i + batch_size]
-            logger.info(f"Processing video batch {i//batch_size + 1} ({len(batch)} videos)")
-
-            # Process batch concurrently
+        raise MissingAPIKeyError("GOOGLE_API_KEY not found in environment variables")
+
+    # Keep up to batch_size videos in flight; a new one starts as soon
+    # as any finishes instead of waiting for a whole batch
+    semaphore = asyncio.Semaphore(batch_size)
+    file_deleter = FileDeleter(api_key=api_key)
+    # Set when an upload may have been left behind by a failed analysis or delete
+    needs_sweep = False
+
+    async def analyze_with_limit(video_path: str):
+        nonlocal needs_sweep
+        async with semaphore:
             try:
-                batch_results = await asyncio.gather(
-                    *(analyze_video(video_path, output_file, prompt_template) for video_path in batch),
-                    return_exceptions=True
-                )
-
-                # Handle results and any exceptions
-                for video_path, result in zip(batch, batch_results):
-                    if isinstance(result, Exception):
-                        logger.error(f"Failed to process {video_path}: {str(result)}")
-                        results.append((video_path, []))
-                        token_usage.append({"video": video_path, "status": "failed", "model_name": config.model_name, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost": 0.0})
-                    else:
-                        if isinstance(result, tuple) and len(result) == 2:
-                            highlights, usage = result
-                            results.append((video_path, highlights))
-                            token_usage.append(usage)
-                        else:
-                            results.append((video_path, result))
-                            logger.warning(f"No token usage data for {video_path}")
-                            token_usage.append({"video": video_path, "status": "no_tokens", "model_name": config.model_name, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost": 0.0})
+                return await analyze_video(video_path, output_file, prompt_template)
+            except Exception:
+                needs_sweep = True
+                raise
+            finally:
+                # Delete this video's upload before releasing its slot, so at
+                # most batch_size uploads are stored at once
+                video_file = pop_uploaded_file(video_path)
+                if video_file is not None and not await asyncio.to_thread(file_deleter.delete_file, video_file.name):
+                    needs_sweep = True
 
-                logger.info(f"✓ Completed batch {i//batch_size + 1}")
+    try:
+        logger.info(f"Analyzing {len(video_paths)} video(s), up to {batch_size} at a time")
+        try:
+            all_results = await asyncio.gather(
+                *(analyze_with_limit(video_path) for video_path in video_paths),
+                return_exceptions=True
+            )
 
-            except Exception as e:
-                logger.error(f"Error processing batch: {str(e)}")
-                # Add empty results for failed batch
-                for video_path in batch:
+            # Handle results and any exceptions
+            for video_path, result in zip(video_paths, all_results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to process {video_path}: {str(result)}")
                     results.append((video_path, []))
-                    logger.error(f"Failed to process {video_path} in batch")
-            
-            finally:
-                # Clean up files after each batch
+                    token_usage.append({"video": video_path, "status": "failed", "model_name": config.model_name, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost": 0.0})
+                else:
+                    if isinstance(result, tuple) and len(result) == 2:
+                        highlights, usage = result
+                        results.append((video_path, highlights))
+                        token_usage.append(usage)
+                    else:
+                        results.append((video_path, result))
+                        logger.warning(f"No token usage data for {video_path}")
+                        token_usage.append({"video": video_path, "status": "no_tokens", "model_name": config.model_name, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost": 0.0})
+
+        finally:
+            # Uploads are deleted per video above; sweep whatever a failure
+            # may have left behind once nothing is in flight
+            if needs_sweep:
                 try:
-                    logger.debug(f"Cleaning up temporary API files for batch {i//batch_size + 1}...")
-                    file_deleter = FileDeleter(api_key=api_key)
-                    file_deleter.delete_all_files()
-                    logger.debug("✓ Cleanup complete for current batch")
+                    logger.debug("Cleaning up temporary API files...")
+                    forget_uploaded_files()
+                    await asyncio.to_thread(file_deleter.delete_all_files)
+                    logger.debug("✓ Cleanup complete")
                 except Exception as e:
                     logger.error(f"Failed to cleanup files from Google Files API: {str(e)}")
 
@@ -159,9 +205,11 @@ async def analyze_videos_batch(video_paths: List[str], output_file: str = "expor
             # Define fieldnames including model_name to match the data structure
             fieldnames = ["video", "status", "model_name", "prompt_tokens", "completion_tokens", "total_tokens", "cost"]
             
-            with open(token_cost_file, 'w', newline='') as f:
+            with open(token_cost_file, 'a' if append_token_costs else 'w', newline='') as f:
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
+                # A new or empty file needs the header first
+                if f.tell() == 0:
+                    writer.writeheader()
                 writer.writerows(token_usage)
             logger.info(f"✓ Token usage saved to {token_cost_file}")
             logger.info(f"Total tokens: {total_tokens} (Input: {total_prompt_tokens}, Output: {total_completion_tokens})")
@@ -171,7 +219,7 @@ async def analyze_videos_batch(video_paths: List[str], output_file: str = "expor
 
     return results
 
-async def analyze_video(video_path: str, output_file: str = "exported_metadata/highlights.json", prompt_template=None, game_type: Optional[str] = None, temperature: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+async def analyze_video(video_path: str, output_file: str = "exported_metadata/highlights.json", prompt_template=None, game_type: Optional[str] = None, temperature: Optional[float] = None, read_existing: Optional[Callable[[], Dict[str, Any]]] = None, write_back: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Analyze a video file using Gemini and append results to JSON file
 
@@ -181,8 +229,12 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
         prompt_template: Template string for the analysis prompt
         game_type: Optional game type to override config setting
         temperature: Optional temperature to override config setting
+        read_existing: Optional callable returning the current contents of
+            output_file, used instead of reading the file (e.g. a cached copy)
+        write_back: Optional callable that stores the updated contents,
+            used instead of writing output_file directly
     """
-    config = Config()
+    config = get_config()
     model_name = config.model_name
     
     # Use provided temperature or fall back to config
@@ -195,31 +247,38 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
 
         # Check if it's actually a video file (Gemini supports MP4)
         if not video_path.lower().endswith('.mp4'):
-            raise ValueError(f"File must be in MP4 format for best compatibility with Gemini")
+            raise UnsupportedVideoFormatError("File must be in MP4 format for best compatibility with Gemini")
 
         # Use provided game_type or fall back to config
         effective_game_type = game_type or config.game_type
         logger.info(f"Analyzing video: {os.path.basename(video_path)} with model: {model_name}, game type: {effective_game_type}, temperature: {effective_temperature}")
 
         # Initialize Gemini client
-        dotenv.load_dotenv()
-        api_key = os.getenv("GOOGLE_API_KEY")
+        api_key = get_api_key()
         if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
+            raise MissingAPIKeyError("GOOGLE_API_KEY not found in environment variables")
 
-        client = genai.Client(api_key=api_key, http_options=types.HttpOptions(api_version="v1beta"))
+        client = _get_client(api_key)
         
         # Get or create prompt cache if enabled
         prompt_cache = await get_or_create_prompt_cache(client, config)
 
+        upload_key = _upload_key(video_path)
         try:
-            # Upload the video file using a thread pool to not block
-            logger.debug("Uploading video to API...")
             loop = asyncio.get_event_loop()
-            video_file = await loop.run_in_executor(
-                None,
-                partial(client.files.upload, file=Path(video_path))
-            )
+            with _uploaded_files_lock:
+                video_file = _uploaded_files.get(upload_key)
+            if video_file is None:
+                # Upload the video file using a thread pool to not block
+                logger.debug("Uploading video to API...")
+                video_file = await loop.run_in_executor(
+                    None,
+                    partial(client.files.upload, file=Path(video_path))
+                )
+                with _uploaded_files_lock:
+                    _uploaded_files[upload_key] = video_file
+            else:
+                logger.debug("Reusing uploaded video from an earlier attempt")
 
             # Wait for file to be processed
             retry_delay = config.retry_delay_seconds
@@ -340,7 +399,7 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
                 raise ValueError("Empty response from API")
                 
             try:
-                response_json = json.loads(response.candidates[0].content.parts[0].text)
+                response_json = json_io.loads(response.candidates[0].content.parts[0].text)
             except (json.JSONDecodeError, AttributeError, IndexError) as e:
                 raise ValueError(f"Failed to parse API response as JSON: {str(e)}")
 
@@ -355,6 +414,7 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
             for highlight in response_json["highlights"]:
                 processed_highlight = {
                     "source_video": str(video_path),
+                    "source_basename": os.path.basename(video_path),
                     "model_name": model_name,
                     "game_type": effective_game_type,
                     "timestamp_start_seconds": highlight["timestamp_start_seconds"],
@@ -366,16 +426,18 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
 
             # Save to file if output_file is specified
             if output_file:
-                os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
-
-                # Initialize file if it doesn't exist
-                if not os.path.exists(output_file):
-                    with open(output_file, 'w') as f:
-                        json.dump({"highlights": [], "model_name": model_name}, f)
-
-                # Read existing data
-                with open(output_file, 'r') as f:
-                    existing_data = json.load(f)
+                if read_existing is not None:
+                    # Copy so a failed write leaves the caller's data untouched
+                    existing_data = dict(read_existing())
+                    existing_data["highlights"] = list(existing_data.get("highlights", []))
+                else:
+                    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+
+                    # Read existing data, starting fresh if the file doesn't exist
+                    try:
+                        existing_data = json_io.load_file(output_file)
+                    except FileNotFoundError:
+                        existing_data = {"highlights": [], "model_name": model_name}
                 
                 # Ensure the model_name is included in the root object
                 existing_data["model_name"] = model_name
@@ -385,9 +447,11 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
                     existing_data["highlights"] = []
                 existing_data["highlights"].extend(processed_highlights)
 
-                # Write updated data back to file
-                with open(output_file, 'w') as f:
-                    json.dump(existing_data, f, indent=2)
+                # Write updated data back
+                if write_back is not None:
+                    write_back(existing_data)
+                else:
+                    json_io.dump_file(output_file, existing_data)
 
                 logger.info(f"✓ Found {len(processed_highlights)} highlights in {os.path.basename(video_path)}")
             
@@ -408,6 +472,9 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse API response as JSON: {str(e)}")
         except Exception as e:
+            # The upload may be unusable, so upload again on the next attempt
+            with _uploaded_files_lock:
+                _uploaded_files.pop(upload_key, None)
             raise RuntimeError(f"Error during API call or response processing: {str(e)}")
 
     except FileNotFoundError as e:
@@ -423,7 +490,7 @@ async def analyze_video(video_path: str, output_file: str = "exported_metadata/h
         token_data = {"video": video_path, "status": "error", "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost": 0.0}
         raise
 
-def analyze_videos_sync(video_paths: List[str], output_file: str = "exported_metadata/highlights.json", batch_size: int = None, prompt_template=None, token_cost_file: str = "exported_metadata/token_costs.csv") -> List[Tuple[str, List[Dict[str, Any]]]]:
+def analyze_videos_sync(video_paths: List[str], output_file: str = "exported_metadata/highlights.json", batch_size: int = None, prompt_template=None, token_cost_file: str = "exported_metadata/token_costs.csv", append_token_costs: bool = False) -> List[Tuple[str, List[Dict[str, Any]]]]:
     """
     Synchronous wrapper for analyze_videos_batch
 
@@ -433,9 +500,10 @@ def analyze_videos_sync(video_paths: List[str], output_file: str = "exported_met
         batch_size: Number of videos to process concurrently
         prompt_template: Template string for the analysis prompt
         token_cost_file: Path to the CSV file where token costs will be saved
+        append_token_costs: Append to token_cost_file instead of overwriting it
 
     Returns:
         List of tuples containing (video_path, highlights)
     """
-    return asyncio.run(analyze_videos_batch(video_paths, output_file, batch_size, prompt_template, token_cost_file))
+    return asyncio.run(analyze_videos_batch(video_paths, output_file, batch_size, prompt_template, token_cost_file, append_token_costs))
 
@@ -122,9 +122,9 @@ class VideoConcatenator:
         if create_shorts:
             try:
                 from .shorts_creator import ShortsCreator
-                from .config import Config
+                from .config import get_config
                 
-                config = Config()
+                config = get_config()
                 shorts_creator = ShortsCreator()
                 
                 logger.info("Creating shorts version from concatenated video...")
@@ -0,0 +1,36 @@
+import os
+from typing import Iterator, Tuple
+
+# Lowercase extensions recognised as video files when scanning directories
+VIDEO_EXTENSIONS: Tuple[str, ...] = ('.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm')
+
+def iter_video_files(root: str, extensions: Tuple[str, ...] = VIDEO_EXTENSIONS) -> Iterator[str]:
+    """
+    Recursively yield paths of video files under a directory.
+    
+    Uses an iterative os.scandir walk so each directory is listed once and
+    entry types come from the directory listing instead of extra stat calls.
+    Directories that cannot be read are skipped.
+    
+    Args:
+        root: Directory to scan
+        extensions: Lowercase file extensions to match
+        
+    Yields:
+        Path of each matching file as a string
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        # Most recordings already have lowercase names, so
+                        # only lowercase when the direct check misses
+                        name = entry.name
+                        if name.endswith(extensions) or name.lower().endswith(extensions):
+                            yield entry.path
+        except OSError:
+            continue
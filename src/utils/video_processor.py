@@ -1,25 +1,145 @@
 import os
+import atexit
 import subprocess
 import tempfile
 import logging
 import shutil
 import random
+import threading
 from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 
-from .config import Config
+from .config import get_config
+from . import json_io
 from .shorts_creator import ShortsCreator
 
 logger = logging.getLogger(__name__)
 
+# Compilations encoded by one FFmpeg process in process_many_video_highlights.
+# Consumer NVIDIA GPUs cap concurrent NVENC sessions, so keep this small; it
+# also bounds concurrent encodes across processes when NVENC is in use.
+MAX_OUTPUTS_PER_FFMPEG = 3
+
+# ffprobe results saved across runs, keyed by absolute path
+MEDIA_CACHE_FILE = "exported_metadata/media_cache.json"
+
+# New probe results are written to MEDIA_CACHE_FILE after this many, and
+# once more at exit
+MEDIA_CACHE_SAVE_EVERY = 25
+
 class VideoProcessor:
     
     def __init__(self, output_dir: str = "exported_videos"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self._nvenc_available = None
-        self.config = Config()
+        # The background warm-up can race the first compilation's check
+        self._nvenc_lock = threading.Lock()
+        self.config = get_config()
         self.shorts_creator = ShortsCreator(output_dir)
+        self._media_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._media_cache_lock = threading.Lock()
+        # Probe results not yet written to MEDIA_CACHE_FILE
+        self._media_cache_unsaved = 0
+        atexit.register(self.save_media_cache)
+    
+    def _load_media_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load saved ffprobe results on first use. Caller must hold _media_cache_lock."""
+        if self._media_cache is None:
+            try:
+                self._media_cache = json_io.load_file(MEDIA_CACHE_FILE)
+            except FileNotFoundError:
+                self._media_cache = {}
+            except ValueError as e:
+                logger.warning(f"Error reading {MEDIA_CACHE_FILE}: {e}")
+                self._media_cache = {}
+        return self._media_cache
+    
+    def _write_media_cache(self):
+        """Write the media cache, dropping entries whose video is gone. Caller must hold _media_cache_lock."""
+        cache = self._media_cache
+        # Entries from older versions hold the full ffprobe output; drop those too
+        for key in [key for key, entry in cache.items() if "duration" not in entry or not os.path.exists(key)]:
+            del cache[key]
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(MEDIA_CACHE_FILE)), exist_ok=True)
+            json_io.dump_file(MEDIA_CACHE_FILE, cache)
+            self._media_cache_unsaved = 0
+        except OSError as e:
+            logger.warning(f"Failed to save {MEDIA_CACHE_FILE}: {e}")
+    
+    def save_media_cache(self):
+        """Write probe results that haven't been saved yet to MEDIA_CACHE_FILE."""
+        with self._media_cache_lock:
+            if self._media_cache_unsaved:
+                self._write_media_cache()
+    
+    def get_media_info(self, video_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the duration and video dimensions of a video with ffprobe.
+        
+        Results are cached by absolute path and reused while the file's
+        mtime and size are unchanged, including across runs.
+        
+        Args:
+            video_path: Path to the video file
+            
+        Returns:
+            Dict with "duration", "width" and "height" (each None if
+            unknown), or None if the file can't be probed
+        """
+        key = os.path.abspath(video_path)
+        try:
+            stat = os.stat(key)
+        except OSError as e:
+            logger.warning(f"Cannot probe {video_path}: {e}")
+            return None
+        
+        with self._media_cache_lock:
+            entry = self._load_media_cache().get(key)
+        if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size and "duration" in entry:
+            return {"duration": entry["duration"], "width": entry.get("width"), "height": entry.get("height")}
+        
+        try:
+            output = subprocess.check_output([
+                "ffprobe", "-v", "quiet", "-print_format", "json",
+                "-show_format", "-show_streams", key
+            ])
+            probe = json_io.loads(output)
+        except (subprocess.CalledProcessError, OSError, ValueError) as e:
+            logger.warning(f"ffprobe failed for {video_path}: {e}")
+            return None
+        
+        # Only keep the fields callers read; the full ffprobe output is large
+        info: Dict[str, Any] = {"duration": None, "width": None, "height": None}
+        try:
+            info["duration"] = float(probe.get("format", {})["duration"])
+        except (KeyError, TypeError, ValueError):
+            pass
+        for stream in probe.get("streams", []):
+            if stream.get("codec_type") == "video" and stream.get("width") and stream.get("height"):
+                info["width"], info["height"] = int(stream["width"]), int(stream["height"])
+                break
+        
+        with self._media_cache_lock:
+            self._load_media_cache()[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, **info}
+            self._media_cache_unsaved += 1
+            if self._media_cache_unsaved >= MEDIA_CACHE_SAVE_EVERY:
+                self._write_media_cache()
+        
+        return info
+    
+    @staticmethod
+    def video_dimensions(media_info: Optional[Dict[str, Any]]) -> Optional[Tuple[int, int]]:
+        """Return (width, height) from get_media_info output, if known."""
+        if media_info and media_info.get("width") and media_info.get("height"):
+            return media_info["width"], media_info["height"]
+        return None
+    
+    @staticmethod
+    def media_duration(media_info: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Return the duration in seconds from get_media_info output, if known."""
+        return (media_info or {}).get("duration")
     
     def check_nvenc_availability(self) -> bool:
         """
@@ -31,24 +151,51 @@ class VideoProcessor:
         if self._nvenc_available is not None:
             return self._nvenc_available
         
-        try:
-            # Test if h264_nvenc encoder is available
-            cmd = ['ffmpeg', '-hide_banner', '-encoders']
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        with self._nvenc_lock:
+            if self._nvenc_available is not None:
+                return self._nvenc_available
             
-            # Check if h264_nvenc is in the output
-            self._nvenc_available = 'h264_nvenc' in result.stdout
-            
-            if self._nvenc_available:
-                logger.info("NVENC hardware acceleration available")
-            else:
-                logger.info("NVENC not available, will use CPU encoding")
+            try:
+                # Test if h264_nvenc encoder is available
+                cmd = ['ffmpeg', '-hide_banner', '-encoders']
+                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
                 
-        except subprocess.CalledProcessError:
-            logger.warning("Could not check NVENC availability, defaulting to CPU encoding")
-            self._nvenc_available = False
-        
-        return self._nvenc_available
+                # Check if h264_nvenc is in the output
+                self._nvenc_available = 'h264_nvenc' in result.stdout
+                
+                if self._nvenc_available:
+                    logger.info("NVENC hardware acceleration available")
+                else:
+                    logger.info("NVENC not available, will use CPU encoding")
+                    
+            except subprocess.CalledProcessError:
+                logger.warning("Could not check NVENC availability, defaulting to CPU encoding")
+                self._nvenc_available = False
+            
+            return self._nvenc_available
+    
+    def max_concurrent_encodes(self, limit: int) -> int:
+        """Cap a number of concurrent encodes at the NVENC session limit when NVENC is in use."""
+        if self.check_nvenc_availability():
+            return max(1, min(limit, MAX_OUTPUTS_PER_FFMPEG))
+        return max(1, limit)
+    
+    def warm_up(self):
+        """
+        Do the first compilation's one-time setup ahead of time: probe FFmpeg's
+        encoders, which also pulls its libraries into the OS file cache, and
+        load the saved ffprobe results.
+        """
+        # Runs on a background thread, so log failures instead of raising
+        try:
+            self.check_nvenc_availability()
+        except Exception as e:
+            logger.warning(f"Could not run FFmpeg: {e}")
+        try:
+            with self._media_cache_lock:
+                self._load_media_cache()
+        except Exception as e:
+            logger.warning(f"Could not load {MEDIA_CACHE_FILE}: {e}")
     
     def merge_overlapping_clips(self, highlights: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -89,30 +236,20 @@ class VideoProcessor:
         logger.info(f"Merged {len(highlights)} clips into {len(merged)} clips")
         return merged
     
-    def create_compilation(self, video_path: str, highlights: List[Dict[str, Any]], output_filename: str) -> str:
+    def _segment_filters(self, input_index: int, highlights: List[Dict[str, Any]], output_suffix: str = "") -> List[str]:
         """
-        Create video compilation directly using FFmpeg filter_complex.
-        Extracts and concatenates all segments in a single pass.
+        Build the filter_complex chains that cut and concatenate one input's highlights.
         
         Args:
-            video_path: Path to source video
+            input_index: Index of the ffmpeg input the highlights come from
             highlights: List of highlight dicts with start/end times
-            output_filename: Name for the final compilation video
+            output_suffix: Suffix for the [outv]/[outa] labels, unique per output
             
         Returns:
-            Path to the compilation video file
+            List of filter chains producing [outv{suffix}] and [outa{suffix}]
         """
-        if not highlights:
-            raise ValueError("No highlights to process")
-        
-        output_path = self.output_dir / output_filename
-        
-        # Check if NVENC is available
-        use_nvenc = self.check_nvenc_availability()
-        
-        # Build filter_complex for extracting segments
         filter_parts = []
-        input_labels = []
+        prefix = f"{input_index}_" if output_suffix else ""
         
         for i, highlight in enumerate(highlights):
             start_time = highlight['timestamp_start_seconds']
@@ -120,30 +257,22 @@ class VideoProcessor:
             duration = end_time - start_time
             
             # Create trim filter for each segment
-            filter_parts.append(f"[0:v]trim=start={start_time}:duration={duration},setpts=PTS-STARTPTS[v{i}]")
-            filter_parts.append(f"[0:a]atrim=start={start_time}:duration={duration},asetpts=PTS-STARTPTS[a{i}]")
-            input_labels.extend([f"[v{i}]", f"[a{i}]"])
+            filter_parts.append(f"[{input_index}:v]trim=start={start_time}:duration={duration},setpts=PTS-STARTPTS[v{prefix}{i}]")
+            filter_parts.append(f"[{input_index}:a]atrim=start={start_time}:duration={duration},asetpts=PTS-STARTPTS[a{prefix}{i}]")
         
         # Concatenate all segments
-        video_inputs = "[v" + "][v".join(map(str, range(len(highlights)))) + "]"
-        audio_inputs = "[a" + "][a".join(map(str, range(len(highlights)))) + "]"
-        filter_parts.append(f"{video_inputs}concat=n={len(highlights)}:v=1:a=0[outv]")
-        filter_parts.append(f"{audio_inputs}concat=n={len(highlights)}:v=0:a=1[outa]")
-        
-        filter_complex = ";".join(filter_parts)
-        
-        # Build FFmpeg command
-        cmd = [
-            'ffmpeg',
-            '-i', video_path,
-            '-filter_complex', filter_complex,
-            '-map', '[outv]',
-            '-map', '[outa]',
-        ]
+        video_inputs = "".join(f"[v{prefix}{i}]" for i in range(len(highlights)))
+        audio_inputs = "".join(f"[a{prefix}{i}]" for i in range(len(highlights)))
+        filter_parts.append(f"{video_inputs}concat=n={len(highlights)}:v=1:a=0[outv{output_suffix}]")
+        filter_parts.append(f"{audio_inputs}concat=n={len(highlights)}:v=0:a=1[outa{output_suffix}]")
         
+        return filter_parts
+    
+    def _encoding_args(self, use_nvenc: bool) -> List[str]:
+        """Video, audio and container options for a compilation output."""
         if use_nvenc:
             # NVIDIA hardware acceleration
-            cmd.extend([
+            args = [
                 '-c:v', 'h264_nvenc',
                 '-preset', 'medium',
                 '-pix_fmt', 'yuv420p',
@@ -152,10 +281,10 @@ class VideoProcessor:
                 '-bufsize', '60M',
                 '-g', '30',
                 '-forced-idr', '1',
-            ])
+            ]
         else:
             # CPU encoding fallback
-            cmd.extend([
+            args = [
                 '-c:v', 'libx264',
                 '-preset', 'medium',
                 '-pix_fmt', 'yuv420p',
@@ -165,10 +294,10 @@ class VideoProcessor:
                 '-g', '30',
                 '-keyint_min', '15',
                 '-sc_threshold', '40',
-            ])
+            ]
         
         # Audio and output settings
-        cmd.extend([
+        args.extend([
             '-r', '60',
             '-vsync', 'cfr',
             '-c:a', 'aac',
@@ -176,9 +305,42 @@ class VideoProcessor:
             '-ar', '48000',
             '-ac', '2',
             '-movflags', '+faststart',
-            '-y',
-            str(output_path)
         ])
+        return args
+    
+    def create_compilation(self, video_path: str, highlights: List[Dict[str, Any]], output_filename: str) -> str:
+        """
+        Create video compilation directly using FFmpeg filter_complex.
+        Extracts and concatenates all segments in a single pass.
+        
+        Args:
+            video_path: Path to source video
+            highlights: List of highlight dicts with start/end times
+            output_filename: Name for the final compilation video
+            
+        Returns:
+            Path to the compilation video file
+        """
+        if not highlights:
+            raise ValueError("No highlights to process")
+        
+        output_path = self.output_dir / output_filename
+        
+        # Check if NVENC is available
+        use_nvenc = self.check_nvenc_availability()
+        
+        filter_complex = ";".join(self._segment_filters(0, highlights))
+        
+        # Build FFmpeg command
+        cmd = [
+            'ffmpeg',
+            '-i', video_path,
+            '-filter_complex', filter_complex,
+            '-map', '[outv]',
+            '-map', '[outa]',
+        ]
+        cmd.extend(self._encoding_args(use_nvenc))
+        cmd.extend(['-y', str(output_path)])
         
         try:
             encoder_type = "NVENC" if use_nvenc else "CPU"
@@ -192,22 +354,57 @@ class VideoProcessor:
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to create compilation: {e.stderr}")
             raise
-
-    def process_video_highlights(self, video_path: str, highlights: List[Dict[str, Any]]) -> str:
+    
+    def create_compilations(self, jobs: List[Tuple[str, List[Dict[str, Any]], str]]) -> List[str]:
         """
-        Complete processing pipeline: merge overlapping clips and create compilation.
+        Create several compilations with a single FFmpeg process.
+        
+        Every source video becomes one input and every compilation one output
+        of the same filter_complex graph, so FFmpeg starts once for the group.
         
         Args:
-            video_path: Path to source video
-            highlights: List of highlight dicts
+            jobs: (video_path, highlights, output_filename) for each compilation
             
         Returns:
-            Path to final compilation video
+            Paths to the compilation video files, in job order
         """
-        if not highlights:
-            logger.warning(f"No highlights found for {video_path}")
-            return None
+        if any(not highlights for _, highlights, _ in jobs):
+            raise ValueError("No highlights to process")
         
+        use_nvenc = self.check_nvenc_availability()
+        encoding_args = self._encoding_args(use_nvenc)
+        
+        cmd = ['ffmpeg']
+        filter_parts = []
+        for index, (video_path, highlights, _) in enumerate(jobs):
+            cmd.extend(['-i', video_path])
+            filter_parts.extend(self._segment_filters(index, highlights, output_suffix=str(index)))
+        cmd.extend(['-filter_complex', ";".join(filter_parts)])
+        
+        output_paths = []
+        for index, (_, _, output_filename) in enumerate(jobs):
+            output_path = self.output_dir / output_filename
+            cmd.extend(['-map', f'[outv{index}]', '-map', f'[outa{index}]'])
+            cmd.extend(encoding_args)
+            cmd.extend(['-y', str(output_path)])
+            output_paths.append(str(output_path))
+        
+        try:
+            encoder_type = "NVENC" if use_nvenc else "CPU"
+            logger.info(f"Creating {len(jobs)} compilations in one FFmpeg run using {encoder_type}...")
+            
+            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            for output_path, (_, highlights, _) in zip(output_paths, jobs):
+                logger.info(f"✓ Created compilation with {len(highlights)} segments: {output_path}")
+            
+            return output_paths
+            
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to create compilations: {e.stderr}")
+            raise
+    
+    def _compilation_filename(self, video_path: str, highlights: List[Dict[str, Any]]) -> str:
+        """Pick the output filename for a compilation from a random highlight title."""
         video_name = Path(video_path).stem
         
         # Randomly select a title from the highlights
@@ -221,37 +418,34 @@ class VideoProcessor:
             # Limit length to avoid filesystem issues
             if len(sanitized_title) > 50:
                 sanitized_title = sanitized_title[:50].strip()
-            output_filename = f"{video_name}_{sanitized_title}.mp4"
             logger.info(f"Selected random title for video: '{selected_title}'")
-        else:
-            # Fallback to generic name if no titles available
-            output_filename = f"{video_name}_kills_compilation.mp4"
-            logger.warning("No titles found in highlights, using generic filename")
-        
-        # Step 1: Merge overlapping clips
-        merged_highlights = self.merge_overlapping_clips(highlights)
+            return f"{video_name}_{sanitized_title}.mp4"
         
-        # Step 2: Create compilation directly with filter_complex
-        final_video_path = self.create_compilation(video_path, merged_highlights, output_filename)
-        
-        logger.info(f"✓ Created kill compilation: {final_video_path}")
-        
-        # Step 3: Create shorts if enabled in config
-        logger.info(f"Config make_short setting: {self.config.make_short}")
-        logger.info(f"Config shorts_add_subtitles setting: {self.config.shorts_add_subtitles}")
-        logger.info(f"Config shorts_no_webcam setting: {self.config.shorts_no_webcam}")
-        if self.config.make_short:
+        # Fallback to generic name if no titles available
+        logger.warning("No titles found in highlights, using generic filename")
+        return f"{video_name}_kills_compilation.mp4"
+    
+    def _create_short(self, final_video_path: str, dimensions: Optional[Tuple[int, int]] = None):
+        """Create a short from a finished compilation if enabled in config."""
+        make_short = self.config.make_short
+        add_subtitles = self.config.shorts_add_subtitles
+        no_webcam = self.config.shorts_no_webcam
+        logger.info(f"Config make_short setting: {make_short}")
+        logger.info(f"Config shorts_add_subtitles setting: {add_subtitles}")
+        logger.info(f"Config shorts_no_webcam setting: {no_webcam}")
+        if make_short:
             try:
                 logger.info("Creating short video from compilation...")
-                logger.info(f"Calling create_short_from_compilation with add_subtitles={self.config.shorts_add_subtitles}")
+                logger.info(f"Calling create_short_from_compilation with add_subtitles={add_subtitles}")
                 short_path = self.shorts_creator.create_short_from_compilation(
                     final_video_path,
-                    no_webcam=self.config.shorts_no_webcam,
-                    add_subtitles=self.config.shorts_add_subtitles
+                    no_webcam=no_webcam,
+                    add_subtitles=add_subtitles,
+                    dimensions=dimensions
                 )
                 if short_path:
                     logger.info(f"✓ Created short: {Path(short_path).name}")
-                    if self.config.shorts_add_subtitles:
+                    if add_subtitles:
                         logger.info(f"✓ Short created with subtitles enabled")
                 else:
                     logger.warning("Failed to create short video")
@@ -261,5 +455,93 @@ class VideoProcessor:
                 logger.error(f"Full traceback: {traceback.format_exc()}")
         else:
             logger.info("Shorts creation disabled in config")
+
+    def process_video_highlights(self, video_path: str, highlights: List[Dict[str, Any]], media_info: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Complete processing pipeline: merge overlapping clips and create compilation.
+        
+        Args:
+            video_path: Path to source video
+            highlights: List of highlight dicts
+            media_info: get_media_info output for the source video, looked
+                up when needed and not given
+            
+        Returns:
+            Path to final compilation video
+        """
+        if not highlights:
+            logger.warning(f"No highlights found for {video_path}")
+            return None
+        
+        output_filename = self._compilation_filename(video_path, highlights)
+        
+        # Step 1: Merge overlapping clips
+        merged_highlights = self.merge_overlapping_clips(highlights)
+        
+        # Step 2: Create compilation directly with filter_complex
+        final_video_path = self.create_compilation(video_path, merged_highlights, output_filename)
+        
+        logger.info(f"✓ Created kill compilation: {final_video_path}")
+        
+        # Step 3: Create shorts if enabled in config. Compilations keep the
+        # source resolution, so the source's cached probe gives their size.
+        if self.config.make_short and media_info is None:
+            media_info = self.get_media_info(video_path)
+        self._create_short(final_video_path, self.video_dimensions(media_info))
+        
+        return final_video_path
+    
+    def process_many_video_highlights(self, video_to_highlights: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Optional[str]]:
+        """
+        Create compilations for several videos, sharing FFmpeg runs between them.
+        
+        Videos are encoded MAX_OUTPUTS_PER_FFMPEG at a time in one FFmpeg
+        process. If a combined run fails, that group falls back to one
+        FFmpeg run per video so a single bad file doesn't sink the others.
+        
+        Args:
+            video_to_highlights: Highlight dicts for each source video
+            
+        Returns:
+            Compilation path (or None on failure) for each source video
+        """
+        results: Dict[str, Optional[str]] = {}
+        jobs = []
+        for video_path, highlights in video_to_highlights.items():
+            if not highlights:
+                logger.warning(f"No highlights found for {video_path}")
+                results[video_path] = None
+                continue
+            jobs.append((
+                video_path,
+                self.merge_overlapping_clips(highlights),
+                self._compilation_filename(video_path, highlights)
+            ))
+        
+        for i in range(0, len(jobs), MAX_OUTPUTS_PER_FFMPEG):
+            group = jobs[i:i + MAX_OUTPUTS_PER_FFMPEG]
+            try:
+                if len(group) == 1:
+                    paths = [self.create_compilation(*group[0])]
+                else:
+                    paths = self.create_compilations(group)
+                for (video_path, _, _), path in zip(group, paths):
+                    results[video_path] = path
+            except subprocess.CalledProcessError:
+                if len(group) == 1:
+                    results[group[0][0]] = None
+                    continue
+                logger.warning("Combined FFmpeg run failed, creating compilations one at a time")
+                for video_path, merged_highlights, output_filename in group:
+                    try:
+                        results[video_path] = self.create_compilation(video_path, merged_highlights, output_filename)
+                    except subprocess.CalledProcessError:
+                        results[video_path] = None
+        
+        for video_path, final_video_path in results.items():
+            if final_video_path:
+                logger.info(f"✓ Created kill compilation: {final_video_path}")
+                dimensions = self.video_dimensions(self.get_media_info(video_path)) if self.config.make_short else None
+                self._create_short(final_video_path, dimensions)
         
-        return final_video_path 
\ No newline at end of file
+        return results
@@ -1,7 +1,7 @@
+import os
 import logging
 from collections import deque
 from typing import List, Dict, Any, Callable, Optional
-from pathlib import Path
 
 from .config import Config
 
@@ -33,7 +33,7 @@ class VideoQueue:
             Position in queue (1-based index)
         """
         try:
-            video_name = Path(video_path).name
+            video_name = os.path.basename(video_path)
             
             # Add to the end of deque (LIFO - last in, first out)
             self.queue.append(video_path)
@@ -75,7 +75,7 @@ class VideoQueue:
                 processed_count += 1
                 
                 try:
-                    video_name = Path(video_path).name
+                    video_name = os.path.basename(video_path)
                     self.logger.info(f"📋 Processing queued video {processed_count}/{queue_size}: {video_name}")
                     
                     result = processor_callback(video_path)
@@ -86,7 +86,7 @@ class VideoQueue:
                         self.logger.warning(f"📋 No compilation created for queued video: {video_name}")
                         
                 except Exception as e:
-                    video_name = Path(video_path).name if video_path else "unknown"
+                    video_name = os.path.basename(video_path) if video_path else "unknown"
                     self.logger.error(f"📋 Error processing queued video {video_name}: {str(e)}")
                     continue
             
@@ -97,6 +97,19 @@ class VideoQueue:
             self.logger.error(f"📋 Error processing video queue: {str(e)}")
             return results
     
+    def drain(self) -> List[str]:
+        """
+        Remove and return all queued videos in LIFO order.
+        
+        Returns:
+            Queued video paths, most recently queued first
+        """
+        video_paths = list(reversed(self.queue))
+        self.queue.clear()
+        if video_paths:
+            self.logger.info(f"📋 Took {len(video_paths)} queued video(s) for processing in LIFO order")
+        return video_paths
+    
     def get_queue_status(self) -> Dict[str, Any]:
         """
         Get current queue status information.
@@ -105,7 +118,7 @@ class VideoQueue:
             Dictionary with queue size and video list
         """
         try:
-            video_names = [Path(video_path).name for video_path in self.queue]
+            video_names = [os.path.basename(video_path) for video_path in self.queue]
             
             return {
                 "queue_size": len(self.queue),
@@ -1,8 +1,8 @@
 from src.utils.process_monitor import GameProcessMonitor
-from src.utils.config import Config
+from src.utils.config import get_config
 
 # Create monitor
-monitor = GameProcessMonitor(Config())
+monitor = GameProcessMonitor(get_config())
 
 # Get running games
 games = monitor.get_running_game_processes()